@@ -395,6 +395,23 @@ void gtp_list_games(int id) {
     std::cout << gtp_head(id) << " " << GTP_RULE_ID << GTP_ENDL;
 }
 
+void gtp_setboard(int id, std::string arg, Board_info *board) {
+    std::pair<Board, int> board_player = convert_board_from_str(arg);
+    int player = board_player.second;
+    if (player != BLACK && player != WHITE) {
+        std::cout << gtp_error_head(id) << " " << "illegal board" << GTP_ENDL;
+        return;
+    }
+    board->board = board_player.first.copy();
+    board->player = player;
+    board->boards.clear();
+    board->players.clear();
+    board->boards.emplace_back(board->board.copy());
+    board->players.emplace_back(board->player);
+    board->ply_vec = 0;
+    std::cout << gtp_head(id) << GTP_ENDL;
+}
+
 void gtp_check_command(Board_info *board, State *state, Options *options) {
     std::string cmd_line = gtp_get_command_line();
     if (options->ponder) {
@@ -472,6 +489,9 @@ void gtp_check_command(Board_info *board, State *state, Options *options) {
         case GTP_CMD_ID_LIST_GAMES:
             gtp_list_games(id);
             break;
+        case GTP_CMD_ID_SETBOARD:
+            gtp_setboard(id, arg, board);
+            break;
         default:
             break;
     }
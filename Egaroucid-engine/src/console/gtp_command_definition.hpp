@@ -13,7 +13,7 @@
 #include <vector>
 #include "command_definition.hpp"
 
-#define N_GTP_COMMANDS 21
+#define N_GTP_COMMANDS 22
 
 #define GTP_CMD_ID_QUIT 0
 #define GTP_CMD_ID_GTP_VERSION 1
@@ -36,6 +36,7 @@
 #define GTP_CMD_ID_UNDO 18
 #define GTP_CMD_ID_REG_GENMOVE 19
 #define GTP_CMD_ID_LIST_GAMES 20
+#define GTP_CMD_ID_SETBOARD 21
 
 const Command_info gtp_command_data[N_GTP_COMMANDS] = {
     {GTP_CMD_ID_QUIT,               {"quit"},                                                   "",                 "Quit"},
@@ -58,5 +59,6 @@ const Command_info gtp_command_data[N_GTP_COMMANDS] = {
     {GTP_CMD_ID_SHOWBOARD,          {"showboard"},                                              "",                 ""},
     {GTP_CMD_ID_UNDO,               {"undo"},                                                   "",                 ""},
     {GTP_CMD_ID_REG_GENMOVE,        {"reg_genmove"},                                            "",                 ""},
-    {GTP_CMD_ID_LIST_GAMES,         {"list_games"},                                             "",                 ""}
+    {GTP_CMD_ID_LIST_GAMES,         {"list_games"},                                             "",                 ""},
+    {GTP_CMD_ID_SETBOARD,           {"setboard"},                                               "<board>",          "Set position to <board>. `B`, `W`, `-` each represents black, white, empty. The last character is the side to move."}
 };
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Converts records<N> folders to board data with a pool of converter processes.
+
+Every folder is cut into chunks of --file_interval input files, one output file
+records<N>/<chunk>.dat each. A chunk whose output size matches the number of
+boards the converter reported (and stays within what its input can give) gets a
+done-marker <chunk>.dat.done, so running the same command again after an
+interruption only converts the chunks without one.
+
+    python expand_all.py transcript 223 224 225 --jobs 8
+    python expand_all.py starting_board 89
+    python expand_all.py board 168 169 170
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+RECORD_SIZE = 19 # player, opponent, color, policy, score (README.md)
+
+# mode: (converter, input folder suffix, default file interval)
+MODES = {
+    'transcript': ('expand_transcript.out', '/', 100),
+    'starting_board': ('expand_transcript_with_starting_board.out', '/', 100),
+    'board': ('board_data_processing2.out', '_boards/', 100 * 60), # for Egaroucid_Train_Data.zip
+}
+
+parser = argparse.ArgumentParser()
+parser.add_argument('mode', type=str, choices=list(MODES))
+parser.add_argument('nums', type=int, nargs='+', help='records<N> folders to convert')
+parser.add_argument('--jobs', type=int, default=os.cpu_count())
+parser.add_argument('--file_interval', type=int, default=0, help='input files per output file (default: 100, 6000 for board)')
+parser.add_argument('--ignore_pass_depth', type=int, default=-1, help='transcript: discard games with a pass up to this move')
+parser.add_argument('--exe', type=str, default=None, help='converter (default: by mode)')
+parser.add_argument('--transcript_root_dir', type=str, default='./../../../train_data/transcript/')
+parser.add_argument('--board_root_dir', type=str, default=None, help='default: $EGAROUCID_DATA/train_data/board_data/')
+parser.add_argument('--redo', action='store_true', help='convert chunks that already have a done-marker too')
+args = parser.parse_args()
+
+exe, in_suffix, default_interval = MODES[args.mode]
+exe = args.exe or exe
+file_interval = args.file_interval or default_interval
+board_root_dir = args.board_root_dir or os.environ['EGAROUCID_DATA'] + '/train_data/board_data/'
+log_file = board_root_dir + 'log.txt'
+
+def max_boards(in_dir, s_file, e_file):
+    """Boards the input files can give at most: one per line for board data, one
+    per move for transcripts (after the starting board and a space)."""
+    res = 0
+    for file_num in range(s_file, e_file):
+        with open(in_dir + str(file_num).zfill(7) + '.txt', 'r') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                if args.mode == 'board':
+                    res += 1
+                elif args.mode == 'starting_board':
+                    res += max(0, len(line) - 67) // 2
+                else:
+                    res += len(line) // 2
+    return res
+
+def is_done(chunk):
+    if args.redo:
+        return False
+    try:
+        with open(chunk['out_file'] + '.done', 'r') as f:
+            marker = json.load(f)
+        return marker['cmd'] == chunk['cmd'] and marker['size'] == os.path.getsize(chunk['out_file'])
+    except (FileNotFoundError, ValueError, KeyError):
+        return False
+
+def convert(chunk):
+    """Runs the converter on a chunk and checks its output. Returns (chunk, log line, error)."""
+    p = subprocess.run(chunk['cmd'], stderr=subprocess.DEVNULL, stdout=subprocess.PIPE)
+    out = p.stdout.decode().replace('\r', '').split('\n')[0]
+    log = chunk['out_file'] + '\t' + out
+    if p.returncode:
+        return chunk, log, 'exit code ' + str(p.returncode)
+    m = re.search(r'(\d+) boards', out)
+    if not m:
+        return chunk, log, 'number of boards not reported'
+    n_boards = int(m.group(1))
+    size = os.path.getsize(chunk['out_file'])
+    if size != n_boards * RECORD_SIZE:
+        return chunk, log, 'size ' + str(size) + ' expected ' + str(n_boards * RECORD_SIZE)
+    limit = max_boards(chunk['in_dir'], chunk['s_file'], chunk['e_file'])
+    if n_boards > limit:
+        return chunk, log, str(n_boards) + ' boards from input that has at most ' + str(limit)
+    with open(chunk['out_file'] + '.done', 'w') as f:
+        json.dump({'cmd': chunk['cmd'], 'boards': n_boards, 'size': size}, f)
+    return chunk, log, None
+
+chunks = []
+for num in args.nums:
+    board_dir = board_root_dir + 'records' + str(num)
+    os.makedirs(board_dir, exist_ok=True)
+    in_dir = args.transcript_root_dir + 'records' + str(num) + in_suffix
+    n_files = len(glob.glob(in_dir + '*.txt'))
+    for out_file_idx, s_file in enumerate(range(0, n_files, file_interval)):
+        e_file = min(n_files, s_file + file_interval)
+        out_file = board_dir + '/' + str(out_file_idx) + '.dat'
+        # the transcript converters add the separator themselves
+        cmd = [exe, in_dir.rstrip('/') if in_suffix == '/' else in_dir, str(s_file), str(e_file), out_file]
+        if args.mode == 'transcript' and args.ignore_pass_depth >= 0:
+            cmd.append(str(args.ignore_pass_depth))
+        chunks.append({'in_dir': in_dir, 's_file': s_file, 'e_file': e_file, 'out_file': out_file, 'cmd': cmd})
+
+todo = [chunk for chunk in chunks if not is_done(chunk)]
+print(len(chunks), 'chunks', len(chunks) - len(todo), 'already done', file=sys.stderr)
+n_failed = 0
+with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+    for future in as_completed([executor.submit(convert, chunk) for chunk in todo]):
+        chunk, log, error = future.result()
+        if error:
+            n_failed += 1
+            log += '\tFAILED ' + error
+        print(log)
+        with open(log_file, 'a') as f:
+            f.write(log + '\n')
+if n_failed:
+    print(n_failed, 'chunks failed, run again to retry them', file=sys.stderr)
+    sys.exit(1)
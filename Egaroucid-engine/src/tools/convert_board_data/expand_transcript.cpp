@@ -74,7 +74,7 @@ int trs_convert_transcript(std::string transcript, std::ofstream *fout, int igno
             fout->write((char*)&rev_score, 1);
         }
     }
-    return 1;
+    return (int)boards.size();
 }
 
 int main(int argc, char* argv[]){
@@ -98,6 +98,7 @@ int main(int argc, char* argv[]){
         return 1;
     }
     int t = 0;
+    long long n_boards = 0;
     for (int file_num = strt_file_num; file_num < end_file_num; ++file_num){
         std::cerr << "=";
         std::string file = in_dir + "/" + trs_fill0(file_num, 7) + ".txt";
@@ -108,10 +109,12 @@ int main(int argc, char* argv[]){
         }
         std::string line;
         while (std::getline(ifs, line)){
-            t += trs_convert_transcript(line, &fout, ignore_pass_depth);
+            int n = trs_convert_transcript(line, &fout, ignore_pass_depth);
+            t += n > 0;
+            n_boards += n;
         }
     }
     std::cerr << std::endl;
-    std::cout << t << " games found" << std::endl;
+    std::cout << t << " games found " << n_boards << " boards" << std::endl;
     return 0;
 }
\ No newline at end of file
@@ -25,7 +25,7 @@ struct Trs_Convert_transcript_info{
     int8_t policy;
 };
 
-void trs_convert_transcript_from_starting_board(std::string line, std::ofstream *fout){
+int trs_convert_transcript_from_starting_board(std::string line, std::ofstream *fout){
     std::string starting_board = line.substr(0, 66);
     std::string transcript = line.substr(67);
     std::pair<Board, int> board_player = convert_board_from_str(starting_board);
@@ -49,18 +49,18 @@ void trs_convert_transcript_from_starting_board(std::string line, std::ofstream
         calc_flip(&flip, &board.board, board.policy);
         if (flip.flip == 0ULL){
             std::cerr << "illegal move found in move " << i / 2 << " in " << transcript << std::endl;
-            return;
+            return 0;
         }
         board.board.move_board(&flip);
         board.player ^= 1;
     }
     if (board.board.get_legal()){
-        return;
+        return 0;
     }
     board.board.pass();
     board.player ^= 1;
     if (board.board.get_legal()){
-        return;
+        return 0;
     }
     int8_t score = board.board.score_player();
     int8_t rev_score = -score;
@@ -75,6 +75,7 @@ void trs_convert_transcript_from_starting_board(std::string line, std::ofstream
             fout->write((char*)&rev_score, 1);
         }
     }
+    return (int)boards.size();
 }
 
 int main(int argc, char* argv[]){
@@ -94,6 +95,7 @@ int main(int argc, char* argv[]){
         return 1;
     }
     int t = 0;
+    long long n_boards = 0;
     for (int file_num = strt_file_num; file_num < end_file_num; ++file_num){
         std::cerr << "=";
         std::string file = in_dir + "/" + trs_fill0(file_num, 7) + ".txt";
@@ -104,11 +106,11 @@ int main(int argc, char* argv[]){
         }
         std::string line;
         while (std::getline(ifs, line)){
-            trs_convert_transcript_from_starting_board(line, &fout);
+            n_boards += trs_convert_transcript_from_starting_board(line, &fout);
             ++t;
         }
     }
     std::cerr << std::endl;
-    std::cout << t << " games found" << std::endl;
+    std::cout << t << " games found " << n_boards << " boards" << std::endl;
     return 0;
 }
\ No newline at end of file
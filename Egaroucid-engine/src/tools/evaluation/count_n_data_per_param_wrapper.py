@@ -1,37 +1,21 @@
 import subprocess
 import os
+import argparse
+import dataset_registry
 
+parser = argparse.ArgumentParser()
+parser.add_argument('--version', type=str, default=dataset_registry.default_version, help='eval version in datasets.json')
+parser.add_argument('--recipe', type=str, default='train', help='recipe in datasets.json that lists the training data')
+args = parser.parse_args()
 
-N_PHASE = 60
+
+N_PHASE = dataset_registry.version_info(args.version)['n_phases']
 
 
 for phase in range(N_PHASE):
 
-    # 7.5 eval training data?
-    # train_data_nums = [
-    #     18, 19, 20, 21, 24, 25, 28, 29, 30, 31, # old data (without records27)
-    #     34, 35, # mid-endgame data 1
-    #     #36, # old first11 book
-    #     37, # book data
-    #     38, # old test data
-    #     39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 51, 52, 53, 57, 60, 61, 62, 63, # mid-endgame data 2
-    #     65, 66, 67, 68, 69, 70, 71, 72, 73, 74, # Egaroucid 7.4.0 1000000 data
-    #     77,  # random 18 discs (GGS)
-    #     78, 79, # random 11 & 12 (bug fixed)
-    #     80, # new first11 book
-    #     #81, # test data
-    #     82 # random 12
-    # ]
-    # if int(phase) <= 11:
-    #     train_data_nums = [37, 80] # use only book with phase <= 11
-    # train_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/20250513_1/'
-
-
-    # 7.8 training data
-    train_data_nums = [
-        hogehoge
-    ]
-    train_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/20241125_1/'
+    train_data_nums = dataset_registry.recipe_datasets(args.recipe, phase, args.version)
+    train_root_dir = dataset_registry.bin_root_dir(args.version)
 
 
     train_dirs = [train_root_dir + str(int(phase)) + '/']
@@ -2,6 +2,7 @@
 #include <fstream>
 #include <sstream>
 #include <iomanip>
+#include <vector>
 #include "evaluation_definition.hpp"
 
 struct Datum {
@@ -11,18 +12,33 @@ struct Datum {
     int16_t score_short;
 };
 
+std::string phase_output_file(std::string file, int phase){
+    const std::string placeholder = "{phase}";
+    size_t pos = file.find(placeholder);
+    if (pos != std::string::npos){
+        file.replace(pos, placeholder.size(), std::to_string(phase));
+    }
+    return file;
+}
+
+void write_datum(std::ofstream &fout, int16_t n, int16_t player_short, uint16_t idxes[], int16_t score_short){
+    fout.write((char*)&n, 2);
+    fout.write((char*)&player_short, 2);
+    fout.write((char*)idxes, 2 * ADJ_N_FEATURES);
+    fout.write((char*)&score_short, 2);
+}
+
 int main(int argc, char *argv[]){
     std::cerr << EVAL_DEFINITION_NAME << std::endl;
     std::cerr << EVAL_DEFINITION_DESCRIPTION << std::endl;
     if (argc < 9){
         std::cerr << "input [input dir] [start file no] [n files] [output file] [phase] [use_n_moves_min] [use_n_moves_max] [min_n_data]" << std::endl;
+        std::cerr << "with phase -1, every phase is written in one pass; {phase} in output file is replaced by the phase" << std::endl;
         return 1;
     }
 
     evaluation_definition_init();
 
-    int t = 0;
-
     int start_file = atoi(argv[2]);
     int n_files = atoi(argv[3]);
     int phase = atoi(argv[5]);
@@ -30,18 +46,38 @@ int main(int argc, char *argv[]){
     int use_n_moves_max = atoi(argv[7]);
     int min_n_data = atoi(argv[8]);
 
-    std::ofstream fout;
-    fout.open(argv[4], std::ios::out|std::ios::binary|std::ios::trunc);
-    if (!fout){
-        std::cerr << "can't open output file " << argv[4] << std::endl;
-        return 1;
+    int phase_min = phase, phase_max = phase;
+    if (phase < 0){
+        if (std::string(argv[4]).find("{phase}") == std::string::npos){
+            std::cerr << "output file must contain {phase} with phase -1" << std::endl;
+            return 1;
+        }
+        phase_min = 0;
+        phase_max = ADJ_N_PHASES - 1;
     }
 
-    bool data_not_available = 
-        phase * ADJ_N_PHASE_DISCS > use_n_moves_max || 
-        (phase + 1) * ADJ_N_PHASE_DISCS <= use_n_moves_min;
-    if (data_not_available){
-        std::cerr << "data not available at phase " << phase << std::endl;
+    std::ofstream fout[ADJ_N_PHASES];
+    bool data_available[ADJ_N_PHASES];
+    int t[ADJ_N_PHASES];
+    std::vector<Datum> data_memo[ADJ_N_PHASES];
+    bool any_data_available = false;
+    for (int p = phase_min; p <= phase_max; ++p){
+        std::string out_file = phase_output_file(argv[4], p);
+        fout[p].open(out_file, std::ios::out|std::ios::binary|std::ios::trunc);
+        if (!fout[p]){
+            std::cerr << "can't open output file " << out_file << std::endl;
+            return 1;
+        }
+        data_available[p] = 
+            p * ADJ_N_PHASE_DISCS <= use_n_moves_max && 
+            (p + 1) * ADJ_N_PHASE_DISCS > use_n_moves_min;
+        if (!data_available[p]){
+            std::cerr << "data not available at phase " << p << std::endl;
+        }
+        any_data_available |= data_available[p];
+        t[p] = 0;
+    }
+    if (!any_data_available){
         return 0;
     }
 
@@ -51,7 +87,6 @@ int main(int argc, char *argv[]){
     uint16_t idxes[ADJ_N_FEATURES];
     FILE* fp;
     std::string file;
-    std::vector<Datum> data_memo;
     for (int i = start_file; i < n_files; ++i){
         std::cerr << "=";
         file = std::string(argv[1]) + "/" + std::to_string(i) + ".dat";
@@ -60,9 +95,6 @@ int main(int argc, char *argv[]){
             continue;
         }
         while (true) {
-            //if (repeated && t >= min_n_data) {
-            //    break;
-            //}
             if (fread(&(board.player), 8, 1, fp) < 1)
                 break;
             fread(&(board.opponent), 8, 1, fp);
@@ -70,18 +102,16 @@ int main(int argc, char *argv[]){
             fread(&policy, 1, 1, fp);
             fread(&score, 1, 1, fp);
             n = pop_count_ull(board.player | board.opponent);
-            if (calc_phase(&board, player) == phase && n - 4 >= use_n_moves_min && n - 4 <= use_n_moves_max){
+            int p = calc_phase(&board, player);
+            if (phase_min <= p && p <= phase_max && data_available[p] && n - 4 >= use_n_moves_min && n - 4 <= use_n_moves_max){
                 #ifdef ADJ_MIN_N_DISCS
                 if (ADJ_MIN_N_DISCS <= n && n <= ADJ_MAX_N_DISCS){
                 #endif
                     player_short = player;
                     score_short = score;
                     adj_calc_features(&board, idxes);
-                    fout.write((char*)&n, 2);
-                    fout.write((char*)&player_short, 2);
-                    fout.write((char*)idxes, 2 * ADJ_N_FEATURES);
-                    fout.write((char*)&score_short, 2);
-                    if (t < min_n_data) {
+                    write_datum(fout[p], n, player_short, idxes, score_short);
+                    if (t[p] < min_n_data) {
                         Datum datum;
                         datum.n = n;
                         datum.player_short = player_short;
@@ -89,28 +119,31 @@ int main(int argc, char *argv[]){
                             datum.idxes[j] = idxes[j];
                         }
                         datum.score_short = score_short;
-                        data_memo.emplace_back(datum);
+                        data_memo[p].emplace_back(datum);
                     }
-                    ++t;
+                    ++t[p];
                 #ifdef ADJ_MIN_N_DISCS
                 }
                 #endif
             }
         }
+        fclose(fp);
         if (i % 20 == 19)
             std::cerr << std::endl;
     }
-    while (t < min_n_data) {
-        for (Datum &datum: data_memo) {
-            fout.write((char*)&datum.n, 2);
-            fout.write((char*)&datum.player_short, 2);
-            fout.write((char*)datum.idxes, 2 * ADJ_N_FEATURES);
-            fout.write((char*)&datum.score_short, 2);
-            ++t;
+    for (int p = phase_min; p <= phase_max; ++p){
+        while (data_available[p] && t[p] < min_n_data && data_memo[p].size()) {
+            for (Datum &datum: data_memo[p]) {
+                write_datum(fout[p], datum.n, datum.player_short, datum.idxes, datum.score_short);
+                ++t[p];
+            }
+        }
+        fout[p].close();
+        if (phase_min != phase_max){
+            std::cerr << "phase " << p << " ";
         }
+        std::cerr << t[p] << std::endl;
     }
-    fout.close();
-    std::cerr << t << std::endl;
     return 0;
 
-}
\ No newline at end of file
+}
@@ -0,0 +1,79 @@
+import json
+import os
+
+# datasets.json lists every records<num> dataset (move range, game count, source,
+# tags) and, per eval version, its bin_data directory, executables and named
+# recipes. A recipe is a list of parts {"datasets": [...], "phases": [lo, hi]};
+# a part without "phases" applies to every phase.
+
+registry_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets.json')
+
+with open(registry_file, 'r', encoding='utf-8') as f:
+    registry = json.load(f)
+
+datasets = registry['datasets']
+default_version = registry['default_version']
+
+def version_info(version=None):
+    if version is None:
+        version = default_version
+    if version not in registry['versions']:
+        raise KeyError('unknown eval version ' + version + ', known: ' + ' '.join(registry['versions']))
+    return registry['versions'][version]
+
+def bin_root_dir(version=None):
+    return os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/' + version_info(version)['bin_dir'] + '/'
+
+def n_moves(num):
+    return datasets[str(num)]['n_moves']
+
+def min_n_data(num):
+    return datasets[str(num)].get('min_n_data', 0)
+
+def recipe_datasets(recipe, phase=None, version=None):
+    """Sorted dataset numbers of a recipe; with phase None, those of every phase."""
+    recipes = version_info(version)['recipes']
+    if recipe not in recipes:
+        raise KeyError('version has no recipe ' + recipe + ', known: ' + ' '.join(recipes))
+    res = set()
+    for part in recipes[recipe]:
+        lo, hi = part.get('phases', [0, 59])
+        if phase is None or lo <= phase <= hi:
+            res.update(part['datasets'])
+    return sorted(res)
+
+def record_size(version=None):
+    # one record of data_board_to_idx: n, player, idxes[n_features], score (int16 each)
+    return 2 * (3 + version_info(version)['n_features'])
+
+def record_counts(phase, nums, version=None):
+    """Number of records of each dataset in bin_data/<version>/<phase>/, from the
+    file sizes; a missing file counts as 0."""
+    root = bin_root_dir(version)
+    res = {}
+    for num in nums:
+        try:
+            res[num] = os.stat(root + str(phase) + '/' + str(num) + '.dat').st_size // record_size(version)
+        except FileNotFoundError:
+            res[num] = 0
+    return res
+
+def select_by_budget(recipe, phase, budget, version=None):
+    """Datasets of the recipe for a phase, in the recipe's order, until at least
+    `budget` records are reached. Datasets with no records in the phase are skipped."""
+    recipes = version_info(version)['recipes']
+    candidates = []
+    for part in recipes[recipe]:
+        lo, hi = part.get('phases', [0, 59])
+        if lo <= phase <= hi:
+            candidates.extend(num for num in part['datasets'] if num not in candidates)
+    counts = record_counts(phase, candidates, version)
+    res = []
+    total = 0
+    for num in candidates:
+        if total >= budget:
+            break
+        if counts[num]:
+            res.append(num)
+            total += counts[num]
+    return sorted(res), total
@@ -1,15 +1,91 @@
 import subprocess
 import sys
+import os
+import time
+import argparse
+import dataset_registry
 
-strt_phase = int(sys.argv[1])
-end_phase = int(sys.argv[2])
-minute = int(sys.argv[3])
-alpha = float(sys.argv[4])
-
-for phase in range(strt_phase, end_phase + 1):
-    print('optimizing phase', phase)
-    cmd = 'python eval_optimizer_phase.py ' + str(phase) + ' ' + str(minute) + ' ' + str(alpha)
-    p = subprocess.Popen(cmd.split(), stdout=subprocess.PIPE)
-    line = p.stdout.readline().decode().replace('\r', '').replace('\n', '')
-    with open('trained/opt_log.txt', 'a') as f:
-        f.write(line + '\n')
\ No newline at end of file
+parser = argparse.ArgumentParser()
+parser.add_argument('strt_phase', type=int)
+parser.add_argument('end_phase', type=int)
+parser.add_argument('minute', type=int)
+parser.add_argument('alpha', type=float)
+parser.add_argument('--backend', type=str, default='cuda', choices=['cuda', 'cpu', 'numpy'], help='optimizer passed to eval_optimizer_phase.py')
+parser.add_argument('--jobs', type=int, default=0, help='phases to optimize at once (default: 1 with cuda, number of cores otherwise)')
+parser.add_argument('--memory_gb', type=float, default=0, help='memory the running phases may use together (default: physical memory with cpu / numpy, unlimited with cuda)')
+parser.add_argument('--version', type=str, default=dataset_registry.default_version, help='eval version in datasets.json')
+parser.add_argument('--recipe', type=str, default='train', help='recipe in datasets.json that lists the training data')
+parser.add_argument('--budget', type=int, default=0, help='use the recipe datasets in order until this many records are reached (0: all)')
+args = parser.parse_args()
+
+def physical_memory():
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+n_jobs = args.jobs or (1 if args.backend == 'cuda' else os.cpu_count())
+memory_limit = int(args.memory_gb * 1024 ** 3)
+if not memory_limit and args.backend != 'cuda':
+    memory_limit = int(physical_memory() * 0.9)
+
+# A phase holds all its records in memory (struct of n_features uint16 + double score)
+# plus the parameter arrays, so its footprint is known before it starts.
+# eval_optimizer_np.py memory-maps the records and only needs the overhead.
+PHASE_OVERHEAD = 256 * 1024 ** 2
+n_features = dataset_registry.version_info(args.version)['n_features']
+bytes_per_record = (2 * n_features + 7) // 8 * 8 + 8
+
+def phase_memory(phase):
+    if args.backend == 'numpy':
+        return PHASE_OVERHEAD
+    if args.budget:
+        _, n_records = dataset_registry.select_by_budget(args.recipe, phase, args.budget, args.version)
+    else:
+        nums = dataset_registry.recipe_datasets(args.recipe, phase, args.version)
+        n_records = sum(dataset_registry.record_counts(phase, nums, args.version).values())
+    return n_records * bytes_per_record + PHASE_OVERHEAD
+
+def phase_cmd(phase):
+    cmd = [sys.executable, 'eval_optimizer_phase.py', str(phase), str(args.minute), str(args.alpha)]
+    cmd += ['--backend', args.backend, '--version', args.version, '--recipe', args.recipe, '--budget', str(args.budget)]
+    return cmd
+
+phases = list(range(args.strt_phase, args.end_phase + 1))
+memory = {phase: phase_memory(phase) for phase in phases}
+print('jobs', n_jobs, 'memory limit', str(round(memory_limit / 1024 ** 3, 1)) + ' GB' if memory_limit else 'none', file=sys.stderr)
+
+# phases start in order whenever a slot and enough memory are free; a phase larger
+# than the whole limit runs alone. Results are written to opt_log.txt in phase order.
+waiting = phases[:]
+running = {}
+results = {}
+next_log = 0
+while waiting or running:
+    while waiting and len(running) < n_jobs:
+        phase = waiting[0]
+        used = sum(memory[elem] for elem in running)
+        if memory_limit and running and used + memory[phase] > memory_limit:
+            break
+        print('optimizing phase', phase, 'estimated memory', round(memory[phase] / 1024 ** 3, 2), 'GB', file=sys.stderr)
+        running[phase] = subprocess.Popen(phase_cmd(phase), stdout=subprocess.PIPE)
+        waiting.pop(0)
+    time.sleep(1)
+    for phase, p in list(running.items()):
+        if p.poll() is None:
+            continue
+        line = p.stdout.readline().decode().replace('\r', '').replace('\n', '')
+        p.stdout.close()
+        if p.returncode:
+            print('phase', phase, 'failed with exit code', p.returncode, file=sys.stderr)
+        results[phase] = line
+        del running[phase]
+    while next_log < len(phases) and phases[next_log] in results:
+        with open('trained/opt_log.txt', 'a') as f:
+            f.write(results[phases[next_log]] + '\n')
+        next_log += 1
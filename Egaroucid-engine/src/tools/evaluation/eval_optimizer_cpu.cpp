@@ -0,0 +1,439 @@
+/*
+    Egaroucid Project
+
+    @file eval_optimizer_cpu.cpp
+        Evaluation Function Optimizer on CPU
+        same arguments, algorithm and output as eval_optimizer_cuda.cu,
+        single-threaded so that several phases can be optimized at once
+    @date 2021-2026
+    @author Takuto Yamana
+    @license GPL-3.0-or-later
+*/
+
+#include <cstdio>
+#include <cmath>
+#include <vector>
+#include <string>
+#include <fstream>
+#include <iostream>
+#include <random>
+#include <algorithm>
+#include <chrono>
+#define OPTIMIZER_INCLUDE
+#include "evaluation_definition.hpp"
+
+#if ADJ_CELL_WEIGHT
+    #error "cell weight evaluation is not supported by the CPU optimizer"
+#endif
+
+// train data constant
+#define ADJ_MAX_N_FILES 200
+#define ADJ_MAX_N_DATA 200000000
+
+// training constant
+#define ADJ_IGNORE_N_APPEAR 0
+
+struct Adj_Data {
+    uint16_t features[ADJ_N_FEATURES];
+    double score;
+};
+
+struct Adj_Loss {
+    double mse;
+    double mae;
+};
+
+/*
+    @brief timing function
+
+    @return time in milliseconds
+*/
+inline uint64_t tim(){
+    return std::chrono::duration_cast<std::chrono::milliseconds>(std::chrono::high_resolution_clock::now().time_since_epoch()).count();
+}
+
+/*
+    @brief import pre-calculated evaluation function
+*/
+void adj_import_eval(std::string file, std::vector<double> &eval_arr) {
+    std::ifstream ifs(file);
+    if (ifs.fail()) {
+        std::cerr << "evaluation file " << file << " not exist, initialize with 0" << std::endl;
+        return;
+    }
+    std::cerr << "importing eval params " << file << std::endl;
+    std::string line;
+    for (double &elem: eval_arr){
+        if (!getline(ifs, line)) {
+            std::cerr << "ERROR evaluation file broken" << std::endl;
+            return;
+        }
+        elem = stof(line);
+    }
+}
+
+/*
+    @brief import train data
+*/
+void adj_import_data(int n_files, char* files[], std::vector<Adj_Data> &data) {
+    int16_t n_discs, score, player;
+    Adj_Data datum;
+    double score_avg = 0.0;
+    // reserve once so that the peak memory is the data itself (eval_optimizer.py plans with it)
+    size_t n_reserve = 0;
+    for (int file_idx = 0; file_idx < n_files; ++file_idx) {
+        FILE* fp = fopen(files[file_idx], "rb");
+        if (fp != nullptr) {
+            fseek(fp, 0, SEEK_END);
+            n_reserve += ftell(fp) / (2 * (3 + ADJ_N_FEATURES));
+            fclose(fp);
+        }
+    }
+    data.reserve(std::min(n_reserve, (size_t)ADJ_MAX_N_DATA));
+    for (int file_idx = 0; file_idx < n_files; ++file_idx) {
+        FILE* fp = fopen(files[file_idx], "rb");
+        if (fp == nullptr) {
+            std::cerr << "can't open " << files[file_idx] << std::endl;
+            continue;
+        }
+        size_t n_data_before = data.size();
+        while (data.size() < ADJ_MAX_N_DATA) {
+            if (fread(&n_discs, 2, 1, fp) < 1)
+                break;
+            fread(&player, 2, 1, fp);
+            fread(datum.features, 2, ADJ_N_FEATURES, fp);
+            fread(&score, 2, 1, fp);
+            datum.score = (double)score * ADJ_STEP;
+            score_avg += score;
+            data.emplace_back(datum);
+        }
+        fclose(fp);
+        if (n_data_before < data.size()) {
+            std::cerr << files[file_idx] << " " << data.size() << std::endl;
+        }
+    }
+    score_avg /= data.size();
+    std::cerr << "score avg " << score_avg << std::endl;
+}
+
+inline double adj_predict(const std::vector<double> &eval_arr, const int start_idx_arr[], const Adj_Data &datum){
+    double predicted_value = 0.0;
+    for (int i = 0; i < ADJ_N_FEATURES; ++i){
+        predicted_value += eval_arr[start_idx_arr[i] + (int)datum.features[i]];
+    }
+    return std::clamp(predicted_value, (double)(-HW2 * ADJ_STEP), (double)(HW2 * ADJ_STEP));
+}
+
+/*
+    @brief calculate residual error (adds the residual of every appearance to residual_arr)
+*/
+Adj_Loss adj_calculate_residual(const std::vector<double> &eval_arr, const int start_idx_arr[], const Adj_Data *data, const int n_data, const std::vector<int> &rev_idx_arr, std::vector<double> &residual_arr){
+    Adj_Loss loss = {0.0, 0.0};
+    for (int data_idx = 0; data_idx < n_data; ++data_idx){
+        double residual_error = data[data_idx].score - adj_predict(eval_arr, start_idx_arr, data[data_idx]);
+        for (int i = 0; i < ADJ_N_FEATURES; ++i){
+            int idx = start_idx_arr[i] + (int)data[data_idx].features[i];
+            residual_arr[idx] += residual_error;
+            residual_arr[rev_idx_arr[idx]] += residual_error;
+        }
+        loss.mse += (residual_error / ADJ_STEP) * (residual_error / ADJ_STEP) / n_data;
+        loss.mae += fabs(residual_error / ADJ_STEP) / n_data;
+    }
+    return loss;
+}
+
+/*
+    @brief calculate val loss
+*/
+Adj_Loss adj_calculate_val_loss(const std::vector<double> &eval_arr, const int start_idx_arr[], const Adj_Data *data, const int n_data){
+    Adj_Loss loss = {0.0, 0.0};
+    for (int data_idx = 0; data_idx < n_data; ++data_idx){
+        double residual_error = data[data_idx].score - adj_predict(eval_arr, start_idx_arr, data[data_idx]);
+        loss.mse += (residual_error / ADJ_STEP) * (residual_error / ADJ_STEP) / n_data;
+        loss.mae += fabs(residual_error / ADJ_STEP) / n_data;
+    }
+    return loss;
+}
+
+/*
+    @brief calculate loss with integer parameters (round-up or round-down of each)
+*/
+Adj_Loss adj_calculate_loss_round(const std::vector<int> &eval_arr_roundup, const std::vector<int> &eval_arr_rounddown, const std::vector<char> &round_arr, const int start_idx_arr[], const Adj_Data *data, const int n_data){
+    Adj_Loss loss = {0.0, 0.0};
+    for (int data_idx = 0; data_idx < n_data; ++data_idx){
+        int predicted_value = 0;
+        for (int i = 0; i < ADJ_N_FEATURES; ++i){
+            int idx = start_idx_arr[i] + (int)data[data_idx].features[i];
+            predicted_value += round_arr[idx] ? eval_arr_rounddown[idx] : eval_arr_roundup[idx];
+        }
+        predicted_value += predicted_value >= 0 ? ADJ_STEP_2 : -ADJ_STEP_2;
+        predicted_value /= ADJ_STEP;
+        predicted_value = std::clamp(predicted_value, -HW2, HW2);
+        double residual_error = data[data_idx].score / ADJ_STEP - predicted_value;
+        loss.mse += residual_error * residual_error / n_data;
+        loss.mae += fabs(residual_error) / n_data;
+    }
+    return loss;
+}
+
+/*
+    @brief Adam Optimizer
+*/
+void adam(const int phase, std::vector<double> &eval_arr, const std::vector<int> &n_appear_arr, std::vector<double> &residual_arr, double alpha_stab, std::vector<double> &m_arr, std::vector<double> &v_arr, const int n_loop){
+    constexpr double beta1 = 0.9;
+    constexpr double beta2 = 0.999;
+    constexpr double epsilon = 1e-7;
+    const double lrt_coef = sqrt(1.0 - pow(beta2, n_loop)) / (1.0 - pow(beta1, n_loop));
+    for (size_t eval_idx = 0; eval_idx < eval_arr.size(); ++eval_idx){
+        if (n_appear_arr[eval_idx] > ADJ_IGNORE_N_APPEAR || (phase <= 11 && n_appear_arr[eval_idx] > 0)) {
+            double lr = alpha_stab / (double)n_appear_arr[eval_idx];
+            double grad = 2.0 * residual_arr[eval_idx];
+            double lrt = lr * lrt_coef;
+            m_arr[eval_idx] += (1.0 - beta1) * (grad - m_arr[eval_idx]);
+            v_arr[eval_idx] += (1.0 - beta2) * (grad * grad - v_arr[eval_idx]);
+            eval_arr[eval_idx] += lrt * m_arr[eval_idx] / (sqrt(v_arr[eval_idx]) + epsilon);
+            eval_arr[eval_idx] = std::clamp(eval_arr[eval_idx], (double)-ADJ_EVAL_PARAM_MAX, (double)ADJ_EVAL_PARAM_MAX);
+        }
+        residual_arr[eval_idx] = 0.0;
+    }
+}
+
+/*
+    @brief Output Parameters as integer
+*/
+void adj_output_param(int phase, const std::vector<double> &eval_arr) {
+    std::string filename = std::string("trained/") + std::to_string(phase) + ".txt";
+    std::ofstream ofs(filename);
+    if (!ofs.is_open()) {
+        std::cerr << "cannot open " << filename << ", output to stdout" << std::endl;
+    } else {
+        for (const double elem: eval_arr) {
+            ofs << (int)round(elem) << '\n';
+        }
+        ofs.close();
+        std::cerr << "data output to " << filename << std::endl;
+    }
+}
+
+void adj_output_weight(int phase, const std::vector<int> &weight_arr) {
+    std::string filename = std::string("trained/weight_") + std::to_string(phase) + ".txt";
+    std::ofstream ofs(filename);
+    if (!ofs.is_open()) {
+        std::cerr << "cannot open " << filename << ", output to stdout" << std::endl;
+    } else {
+        for (const int elem: weight_arr) {
+            ofs << elem << '\n';
+        }
+        ofs.close();
+        std::cerr << "weight output to " << filename << std::endl;
+    }
+}
+
+int main(int argc, char* argv[]) {
+    std::cerr << EVAL_DEFINITION_NAME << std::endl;
+    std::cerr << EVAL_DEFINITION_DESCRIPTION << std::endl;
+    if (argc < 10) {
+        std::cerr << "input [phase] [hour] [minute] [second] [alpha] [n_patience] [reduce_lr_patience] [reduce_lr_ratio] [in_file] [train_data...]" << std::endl;
+        return 1;
+    }
+    if (argc - 10 >= ADJ_MAX_N_FILES) {
+        std::cerr << "too many train files" << std::endl;
+        return 1;
+    }
+    int phase = atoi(argv[1]);
+    uint64_t hour = atoi(argv[2]);
+    uint64_t minute = atoi(argv[3]);
+    uint64_t second = atoi(argv[4]);
+    double alpha = atof(argv[5]);
+    double alpha_in = alpha;
+    int n_patience = atoi(argv[6]);
+    int reduce_lr_patience = atoi(argv[7]);
+    double reduce_lr_ratio = atof(argv[8]);
+    std::string in_file = (std::string)argv[9];
+    int n_train_data_file = argc - 10;
+    second += minute * 60 + hour * 3600;
+    uint64_t msecond = second * 1000;
+
+    int eval_size = 0;
+    for (int i = 0; i < ADJ_N_EVAL; ++i){
+        eval_size += adj_eval_sizes[i];
+    }
+    std::cerr << "eval_size " << eval_size << std::endl;
+    std::vector<double> eval_arr(eval_size, 0.0);
+    std::vector<int> rev_idx_arr(eval_size);
+    std::vector<int> n_appear_arr(eval_size, 0);
+    int strt_idx = 0;
+    for (int i = 0; i < ADJ_N_EVAL; ++i) {
+        for (int j = 0; j < adj_eval_sizes[i]; ++j) {
+            rev_idx_arr[strt_idx + j] = strt_idx + adj_calc_rev_idx(i, j);
+        }
+        strt_idx += adj_eval_sizes[i];
+    }
+    adj_import_eval(in_file, eval_arr);
+    std::vector<Adj_Data> all_data;
+    adj_import_data(n_train_data_file, argv + 10, all_data);
+    int n_all_data = all_data.size();
+    std::cerr << n_all_data << " data loaded" << std::endl;
+    if (n_all_data == 0){
+        std::cerr << "no data" << std::endl;
+        return 1;
+    }
+    // shuffle data
+    std::random_device seed_gen;
+    std::mt19937 engine(seed_gen());
+    std::shuffle(all_data.begin(), all_data.end(), engine);
+    std::cerr << "data shuffled" << std::endl;
+    // divide data
+    int n_val_data, n_train_data;
+    const Adj_Data *train_data = all_data.data();
+    const Adj_Data *val_data;
+    if (phase > 11){ // to phase 11, the all data available
+        n_val_data = n_all_data * 0.05; // use 5% as validation data
+        if (n_val_data <= 0){
+            n_val_data = 1;
+        }
+        n_train_data = n_all_data - n_val_data;
+        val_data = train_data + n_train_data;
+    } else {
+        n_val_data = n_all_data; // use 100% train data
+        n_train_data = n_all_data; // use 100% val data
+        val_data = train_data;
+    }
+    std::cerr << "n_train_data " << n_train_data << " n_val_data " << n_val_data << std::endl;
+    // calculate n_appear of train data
+    int start_idx_arr[ADJ_N_FEATURES];
+    int start_idx = 0;
+    for (int i = 0; i < ADJ_N_FEATURES; ++i){
+        if (i > 0){
+            if (adj_feature_to_eval_idx[i] > adj_feature_to_eval_idx[i - 1]){
+                start_idx += adj_eval_sizes[adj_feature_to_eval_idx[i - 1]];
+            }
+        }
+        start_idx_arr[i] = start_idx;
+    }
+    for (int data_idx = 0; data_idx < n_train_data; ++data_idx){
+        for (int i = 0; i < ADJ_N_FEATURES; ++i){
+            int idx = start_idx_arr[i] + (int)train_data[data_idx].features[i];
+            ++n_appear_arr[idx];
+            ++n_appear_arr[rev_idx_arr[idx]];
+        }
+    }
+    std::vector<int> weight_arr = n_appear_arr;
+    for (int &elem: n_appear_arr) {
+        elem = std::min(50, elem);
+    }
+    std::cerr << "train data appearance calculated" << std::endl;
+
+    std::vector<double> residual_arr(eval_size, 0.0);
+    std::vector<double> m_arr(eval_size, 0.0);
+    std::vector<double> v_arr(eval_size, 0.0);
+    std::cerr << "phase " << phase << std::endl;
+    Adj_Loss loss = adj_calculate_residual(eval_arr, start_idx_arr, train_data, n_train_data, rev_idx_arr, residual_arr);
+    std::fill(residual_arr.begin(), residual_arr.end(), 0.0);
+    std::cerr << "before MSE " << loss.mse << " MAE " << loss.mae << std::endl;
+    uint64_t strt = tim();
+    int n_loop = 0;
+    double min_val_mse = 100000000.0;
+    int n_val_loss_increase = 0;
+    int n_val_loss_increase_reduce_lr = 0;
+    double alpha_stab = alpha / 5.0; // warming up for Adam
+    Adj_Loss val_loss;
+    while (tim() - strt < msecond) {
+        ++n_loop;
+
+        // val loss
+        val_loss = adj_calculate_val_loss(eval_arr, start_idx_arr, val_data, n_val_data);
+        if (val_loss.mse <= min_val_mse){
+            min_val_mse = val_loss.mse;
+            n_val_loss_increase = 0;
+            n_val_loss_increase_reduce_lr = 0;
+        } else{
+            ++n_val_loss_increase;
+            ++n_val_loss_increase_reduce_lr;
+            if (n_val_loss_increase > n_patience){
+                break;
+            }
+        }
+
+        // train loss & residual
+        loss = adj_calculate_residual(eval_arr, start_idx_arr, train_data, n_train_data, rev_idx_arr, residual_arr);
+
+        std::cerr << "\rn_loop " << n_loop << " progress " << (tim() - strt) * 100 / msecond << "% MSE " << loss.mse << " MAE " << loss.mae << "  val_MSE " << val_loss.mse << " val_MAE " << val_loss.mae << " val_loss_inc " << n_val_loss_increase << " alpha " << alpha_stab << "                    ";
+
+        // next step
+        adam(phase, eval_arr, n_appear_arr, residual_arr, alpha_stab, m_arr, v_arr, n_loop);
+        if (alpha_stab < alpha) {
+            alpha_stab += alpha / 50.0;
+        }
+        if (n_val_loss_increase_reduce_lr >= reduce_lr_patience) {
+            alpha *= reduce_lr_ratio;
+            n_val_loss_increase_reduce_lr = 0;
+        }
+        if (alpha_stab > alpha) {
+            alpha_stab = alpha;
+        }
+    }
+    std::cerr << std::endl;
+
+    // init round eval with hillclimb
+    std::vector<int> eval_arr_roundup(eval_size), eval_arr_rounddown(eval_size);
+    std::vector<char> round_arr(eval_size); // 0 for round-up, 1 for round-down
+    for (int i = 0; i < eval_size; ++i){
+        eval_arr_roundup[i] = ceilf(eval_arr[i]);
+        eval_arr_rounddown[i] = floorf(eval_arr[i]);
+        round_arr[i] = (round(eval_arr[i]) == eval_arr_rounddown[i]);
+    }
+
+    // round eval with hillclimb
+    Adj_Loss min_loss = adj_calculate_loss_round(eval_arr_roundup, eval_arr_rounddown, round_arr, start_idx_arr, train_data, n_train_data);
+    std::cerr << "before rounding MSE " << min_loss.mse << " MAE " << min_loss.mae << std::endl;
+    std::uniform_int_distribution<int> randint_eval(0, eval_size - 1);
+    uint64_t round_n_loop = 0, round_n_updated = 0, round_n_improve = 0;
+    uint64_t round_strt = tim();
+    uint64_t round_tl = 60000; // 60s
+    while (tim() - round_strt < round_tl && ((double)round_n_improve * 100.0 / round_n_loop > 0.01 || round_n_loop < 100)){
+        int change_idx = randint_eval(engine);
+        if (eval_arr_roundup[change_idx] != eval_arr_rounddown[change_idx]){
+            int rev_change_idx = rev_idx_arr[change_idx];
+            round_arr[change_idx] ^= 1;
+            if (change_idx != rev_change_idx){
+                round_arr[rev_change_idx] ^= 1;
+            }
+            Adj_Loss round_loss = adj_calculate_loss_round(eval_arr_roundup, eval_arr_rounddown, round_arr, start_idx_arr, train_data, n_train_data);
+            if (round_loss.mse <= min_loss.mse){
+                ++round_n_updated;
+                if (round_loss.mse < min_loss.mse){
+                    ++round_n_improve;
+                }
+                min_loss = round_loss;
+            } else{ // revert
+                round_arr[change_idx] ^= 1;
+                if (change_idx != rev_change_idx){
+                    round_arr[rev_change_idx] ^= 1;
+                }
+            }
+            ++round_n_loop;
+            int percent = (tim() - round_strt) * 100 / round_tl;
+            std::cerr << '\r' << "rounding " << percent << "%" << " n_loop " << round_n_loop << " n_updated " << round_n_updated << " n_improve " << round_n_improve << " MSE " << min_loss.mse << " MAE " << min_loss.mae << "                         ";
+        }
+    }
+    std::cerr << std::endl;
+
+    // round eval arr with hillclimb result
+    for (int i = 0; i < eval_size; ++i){
+        eval_arr[i] = round_arr[i] ? eval_arr_rounddown[i] : eval_arr_roundup[i];
+    }
+
+    // calculate final loss
+    loss = adj_calculate_loss_round(eval_arr_roundup, eval_arr_rounddown, round_arr, start_idx_arr, train_data, n_train_data);
+    val_loss = adj_calculate_loss_round(eval_arr_roundup, eval_arr_rounddown, round_arr, start_idx_arr, val_data, n_val_data);
+
+    // output param
+    adj_output_param(phase, eval_arr);
+    adj_output_weight(phase, weight_arr);
+
+    std::cerr << "phase " << phase << " time " << (tim() - strt) << " ms n_train_data " << n_train_data << " n_val_data " << n_val_data << " n_loop " << n_loop << " MSE " << loss.mse << " MAE " << loss.mae << " val_MSE " << val_loss.mse << " val_MAE " << val_loss.mae << " (with int) alpha " << alpha_in << " n_patience " << n_patience << " reduce_lr_patience " << reduce_lr_patience << " reduce_lr_ratio " << reduce_lr_ratio << std::endl;
+    std::cout << "phase " << phase << " time " << (tim() - strt) << " ms n_train_data " << n_train_data << " n_val_data " << n_val_data << " n_loop " << n_loop << " MSE " << loss.mse << " MAE " << loss.mae << " val_MSE " << val_loss.mse << " val_MAE " << val_loss.mae << " (with int) alpha " << alpha_in << " n_patience " << n_patience << " reduce_lr_patience " << reduce_lr_patience << " reduce_lr_ratio " << reduce_lr_ratio << std::endl;
+
+    return 0;
+}
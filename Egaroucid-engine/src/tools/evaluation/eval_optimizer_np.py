@@ -0,0 +1,208 @@
+"""Pattern weight optimizer in NumPy, for machines without CUDA.
+
+Takes the arguments of eval_optimizer_cuda.cu and writes the same files
+(trained/<phase>.txt for output_egev2, trained/weight_<phase>.txt) and the same
+summary line on stdout, so eval_optimizer_phase.py can run it with --backend numpy.
+
+The bin_data files are memory-mapped and read in mini-batches, so a phase never has
+to fit in memory. Each batch scatters its residuals onto the parameters with
+np.bincount; as in the CUDA version a parameter and its symmetric twin
+(adj_calc_rev_idx) share their gradient, and the Adam step of a parameter is
+alpha / min(50, n_appear). The last 5% of every file is validation data from
+phase 12 on; earlier phases train and validate on everything. Parameters are
+rounded to the nearest integer at the end (no rounding hillclimb).
+
+usage: python eval_optimizer_np.py [--version 7.5] [--optimizer adam|gd] [--batch_size N]
+        phase hour minute second alpha n_patience reduce_lr_patience reduce_lr_ratio in_file train_data...
+"""
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import dataset_registry
+import evaluation_definition
+
+parser = argparse.ArgumentParser()
+parser.add_argument('phase', type=int)
+parser.add_argument('hour', type=int)
+parser.add_argument('minute', type=int)
+parser.add_argument('second', type=int)
+parser.add_argument('alpha', type=float)
+parser.add_argument('n_patience', type=int)
+parser.add_argument('reduce_lr_patience', type=int)
+parser.add_argument('reduce_lr_ratio', type=float)
+parser.add_argument('in_file', type=str)
+parser.add_argument('train_data', type=str, nargs='*')
+parser.add_argument('--version', type=str, default=dataset_registry.default_version, help='eval version in datasets.json')
+parser.add_argument('--optimizer', type=str, default='adam', choices=['adam', 'gd'], help='gd: move each parameter by alpha times its mean residual in the batch / n_features')
+parser.add_argument('--batch_size', type=int, default=1 << 16)
+parser.add_argument('--seed', type=int, default=None)
+args = parser.parse_args()
+
+IGNORE_N_APPEAR = 0
+MAX_LR_N_APPEAR = 50
+VAL_RATIO = 0.05
+
+definition = evaluation_definition.for_version(args.version)
+n_params = definition.n_params
+rev_idx = definition.rev_idx()
+rng = np.random.default_rng(args.seed)
+
+def import_eval(file):
+    params = np.zeros(n_params, dtype=np.float64)
+    if not os.path.isfile(file):
+        print('evaluation file', file, 'not exist, initialize with 0', file=sys.stderr)
+        return params
+    print('importing eval params', file, file=sys.stderr)
+    loaded = np.loadtxt(file, dtype=np.float64, ndmin=1)
+    if len(loaded) < n_params:
+        print('ERROR evaluation file broken', file=sys.stderr)
+        return params
+    return loaded[:n_params]
+
+def batches(data, ranges, shuffle=False):
+    """(features, score) of every batch of the record ranges [(file index, start, end)]."""
+    chunks = [(i, s, min(s + args.batch_size, e)) for i, start, e in ranges for s in range(start, e, args.batch_size)]
+    order = rng.permutation(len(chunks)) if shuffle else range(len(chunks))
+    for chunk_idx in order:
+        i, s, e = chunks[chunk_idx]
+        records = np.asarray(data[i][s:e])
+        yield records['features'], records['score'].astype(np.float64)
+
+def predict(params, idx):
+    return np.clip(params[idx].sum(axis=1), -definition.score_max * definition.step, definition.score_max * definition.step)
+
+def loss_float(params, data, ranges):
+    se = ae = 0.0
+    n = 0
+    for features, score in batches(data, ranges):
+        residual = score - predict(params, definition.param_idx(features)) / definition.step
+        se += (residual * residual).sum()
+        ae += np.abs(residual).sum()
+        n += len(score)
+    return se / n, ae / n
+
+def loss_int(params, data, ranges):
+    se = ae = 0.0
+    n = 0
+    for features, score in batches(data, ranges):
+        residual = score - definition.predict_int(params, features)
+        se += (residual * residual).sum()
+        ae += np.abs(residual).sum()
+        n += len(score)
+    return se / n, ae / n
+
+def scatter(idx, values):
+    """Sum of values per parameter, shared between symmetric twins."""
+    res = np.bincount(idx.ravel(), weights=np.repeat(values, idx.shape[1]), minlength=n_params)
+    return res + res[rev_idx]
+
+def main():
+    phase = args.phase
+    alpha = args.alpha
+    msecond = ((args.hour * 60 + args.minute) * 60 + args.second) * 1000
+    print('phase', phase, 'n_params', n_params, file=sys.stderr)
+    params = import_eval(args.in_file)
+    data = evaluation_definition.open_data(args.train_data, definition.record_dtype())
+    if not data:
+        print('no data', file=sys.stderr)
+        return 1
+    train_ranges = []
+    val_ranges = []
+    for i, records in enumerate(data):
+        if phase > 11: # to phase 11, the all data available
+            n_val = max(1, int(len(records) * VAL_RATIO))
+            train_ranges.append((i, 0, len(records) - n_val))
+            val_ranges.append((i, len(records) - n_val, len(records)))
+        else:
+            train_ranges.append((i, 0, len(records)))
+            val_ranges.append((i, 0, len(records)))
+    n_train_data = sum(e - s for _, s, e in train_ranges)
+    n_val_data = sum(e - s for _, s, e in val_ranges)
+    print('n_train_data', n_train_data, 'n_val_data', n_val_data, file=sys.stderr)
+
+    n_appear = np.zeros(n_params, dtype=np.int64)
+    for features, _ in batches(data, train_ranges):
+        n_appear += np.bincount(definition.param_idx(features).ravel(), minlength=n_params)
+    n_appear += n_appear[rev_idx]
+    weight = n_appear.copy()
+    trainable = n_appear > IGNORE_N_APPEAR if phase > 11 else n_appear > 0
+    lr_scale = 1.0 / np.maximum(np.minimum(n_appear, MAX_LR_N_APPEAR), 1)
+    print('train data appearance calculated', file=sys.stderr)
+
+    m = np.zeros(n_params, dtype=np.float64)
+    v = np.zeros(n_params, dtype=np.float64)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-7
+    strt = time.time()
+    n_loop = 0
+    n_step = 0
+    min_val_mse = float('inf')
+    n_val_loss_increase = 0
+    n_val_loss_increase_reduce_lr = 0
+    alpha_stab = alpha / 5.0 # warming up for Adam
+    mse = mae = 0.0
+    while (time.time() - strt) * 1000 < msecond:
+        n_loop += 1
+        val_mse, val_mae = loss_float(params, data, val_ranges)
+        if val_mse <= min_val_mse:
+            min_val_mse = val_mse
+            n_val_loss_increase = 0
+            n_val_loss_increase_reduce_lr = 0
+        else:
+            n_val_loss_increase += 1
+            n_val_loss_increase_reduce_lr += 1
+            if n_val_loss_increase > args.n_patience:
+                break
+        se = ae = 0.0
+        for features, score in batches(data, train_ranges, shuffle=True):
+            idx = definition.param_idx(features)
+            residual = score * definition.step - predict(params, idx)
+            se += ((residual / definition.step) ** 2).sum()
+            ae += np.abs(residual / definition.step).sum()
+            count = scatter(idx, np.ones(len(score)))
+            touched = np.flatnonzero((count > 0) & trainable)
+            grad = 2.0 * scatter(idx, residual)[touched]
+            if args.optimizer == 'adam':
+                n_step += 1
+                lrt = alpha_stab * np.sqrt(1.0 - beta2 ** n_step) / (1.0 - beta1 ** n_step)
+                m[touched] += (1.0 - beta1) * (grad - m[touched])
+                v[touched] += (1.0 - beta2) * (grad * grad - v[touched])
+                params[touched] += lrt * lr_scale[touched] * m[touched] / (np.sqrt(v[touched]) + epsilon)
+            else:
+                # every feature of a record moves, so each takes its share of the residual
+                params[touched] += alpha_stab * grad / (2.0 * count[touched] * definition.n_features)
+            np.clip(params, -definition.eval_param_max, definition.eval_param_max, out=params)
+            if (time.time() - strt) * 1000 >= msecond:
+                break
+        mse = se / n_train_data
+        mae = ae / n_train_data
+        print('\rn_loop', n_loop, 'progress', str(int((time.time() - strt) * 100000 / max(msecond, 1))) + '%', 'MSE', mse, 'MAE', mae, ' val_MSE', val_mse, 'val_MAE', val_mae, 'val_loss_inc', n_val_loss_increase, 'alpha', alpha_stab, '                    ', end='', file=sys.stderr)
+        if alpha_stab < alpha:
+            alpha_stab += alpha / 50.0
+        if n_val_loss_increase_reduce_lr >= args.reduce_lr_patience:
+            alpha *= args.reduce_lr_ratio
+            n_val_loss_increase_reduce_lr = 0
+        if alpha_stab > alpha:
+            alpha_stab = alpha
+    print('', file=sys.stderr)
+
+    params_int = (np.sign(params) * np.floor(np.abs(params) + 0.5)).astype(np.int64) # round() of C++
+    mse, mae = loss_int(params_int, data, train_ranges)
+    val_mse, val_mae = loss_int(params_int, data, val_ranges)
+    os.makedirs('trained', exist_ok=True)
+    np.savetxt('trained/' + str(phase) + '.txt', params_int, fmt='%d')
+    print('data output to trained/' + str(phase) + '.txt', file=sys.stderr)
+    np.savetxt('trained/weight_' + str(phase) + '.txt', weight, fmt='%d')
+    print('weight output to trained/weight_' + str(phase) + '.txt', file=sys.stderr)
+
+    summary = ' '.join(str(elem) for elem in [
+        'phase', phase, 'time', int((time.time() - strt) * 1000), 'ms n_train_data', n_train_data, 'n_val_data', n_val_data, 'n_loop', n_loop,
+        'MSE', mse, 'MAE', mae, 'val_MSE', val_mse, 'val_MAE', val_mae, '(with int) alpha', args.alpha,
+        'n_patience', args.n_patience, 'reduce_lr_patience', args.reduce_lr_patience, 'reduce_lr_ratio', args.reduce_lr_ratio])
+    print(summary, file=sys.stderr)
+    print(summary)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
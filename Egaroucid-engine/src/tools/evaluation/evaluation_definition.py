@@ -0,0 +1,114 @@
+import os
+import re
+import numpy as np
+import dataset_registry
+
+# Pattern layout of an evaluation_definition_*.hpp for the Python tools, read from
+# the header itself so that the C++ optimizer and the Python side cannot disagree.
+# Parameters of one phase are the concatenation of every eval (adj_eval_sizes), as
+# in trained/<phase>.txt; feature i of a bin_data record indexes eval
+# adj_feature_to_eval_idx[i].
+
+definition_dir = os.path.dirname(os.path.abspath(__file__))
+
+def strip_comments(text):
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
+    return re.sub(r'//[^\n]*', '', text)
+
+def parse_defines(text, defines):
+    for name, value in re.findall(r'^\s*#define\s+(\w+)[ \t]+([^\n]+)$', text, flags=re.MULTILINE):
+        defines.setdefault(name, value.strip())
+
+def evaluate(expr, defines):
+    expr = re.sub(r'[A-Za-z_]\w*', lambda m: '(' + str(evaluate(defines[m.group(0)], defines)) + ')', expr)
+    if not re.fullmatch(r'[\d\s()+\-*/]+', expr):
+        raise ValueError('not an integer expression: ' + expr)
+    return int(eval(expr.strip().replace('/', '//')))
+
+def parse_array(text, name, defines):
+    m = re.search(r'constexpr\s+int\s+' + name + r'\b[^=]*=\s*\{(.*?)\}\s*;', text, flags=re.DOTALL)
+    if m is None:
+        return None
+    body = m.group(1)
+    rows = re.findall(r'\{([^{}]*)\}', body)
+    if rows:
+        return [[evaluate(elem, defines) for elem in row.split(',') if elem.strip()] for row in rows]
+    return [evaluate(elem, defines) for elem in body.split(',') if elem.strip()]
+
+class EvalDefinition:
+
+    def __init__(self, header_file):
+        if not os.path.isabs(header_file):
+            header_file = os.path.join(definition_dir, header_file)
+        self.header_file = header_file
+        defines = {}
+        with open(header_file, 'r', encoding='utf-8') as f:
+            text = strip_comments(f.read())
+        parse_defines(text, defines)
+        with open(os.path.join(definition_dir, 'evaluation_definition_common.hpp'), 'r', encoding='utf-8') as f:
+            parse_defines(strip_comments(f.read()), defines)
+        if 'ADJ_CELL_WEIGHT' in defines:
+            raise ValueError(header_file + ' is a cell weight definition, not a pattern one')
+        get = lambda name, default=None: evaluate(defines[name], defines) if name in defines else default
+        self.n_phases = get('ADJ_N_PHASES')
+        self.n_features = get('ADJ_N_FEATURES')
+        self.n_eval = get('ADJ_N_EVAL')
+        self.n_patterns = get('ADJ_N_PATTERNS', 0)
+        self.step = get('ADJ_STEP')
+        self.step_2 = get('ADJ_STEP_2')
+        self.eval_param_max = get('ADJ_EVAL_PARAM_MAX', 4091) # EVAL_MAX of output_egev2.cpp
+        self.score_max = get('SCORE_MAX')
+        self.eval_sizes = np.array(parse_array(text, 'adj_eval_sizes', defines), dtype=np.int64)
+        self.feature_to_eval_idx = np.array(parse_array(text, 'adj_feature_to_eval_idx', defines), dtype=np.int64)
+        self.pattern_n_cells = parse_array(text, 'adj_pattern_n_cells', defines) or []
+        self.rev_patterns = parse_array(text, 'adj_rev_patterns', defines) or []
+        assert len(self.eval_sizes) == self.n_eval and len(self.feature_to_eval_idx) == self.n_features
+        # first parameter of each eval, and of the eval each record feature points to
+        self.eval_start_idx = np.concatenate(([0], np.cumsum(self.eval_sizes)[:-1]))
+        self.feature_start_idx = self.eval_start_idx[self.feature_to_eval_idx]
+        self.n_params = int(self.eval_sizes.sum())
+
+    def rev_idx(self):
+        """Index of the symmetric twin of every parameter (adj_calc_rev_idx)."""
+        res = np.arange(self.n_params, dtype=np.int64)
+        for pattern in range(self.n_patterns):
+            n_cells = self.pattern_n_cells[pattern]
+            idx = np.arange(self.eval_sizes[pattern], dtype=np.int64)
+            digits = [(idx // 3 ** (n_cells - 1 - d)) % 3 for d in range(n_cells)]
+            rev = np.zeros_like(idx)
+            for i in range(n_cells):
+                rev += digits[self.rev_patterns[pattern][i]] * 3 ** (n_cells - 1 - i)
+            res[self.eval_start_idx[pattern]:self.eval_start_idx[pattern] + self.eval_sizes[pattern]] = self.eval_start_idx[pattern] + rev
+        return res
+
+    def record_dtype(self):
+        """One record of data_board_to_idx."""
+        return np.dtype([('n_discs', '<i2'), ('player', '<i2'), ('features', '<u2', (self.n_features,)), ('score', '<i2')])
+
+    def param_idx(self, features):
+        """Parameter index of every feature of a batch of records."""
+        return features.astype(np.int64) + self.feature_start_idx
+
+    def round_score(self, v):
+        """Score in discs from a sum of integer parameters, as the engine rounds it."""
+        v = v + np.where(v >= 0, self.step_2, -self.step_2)
+        v = np.sign(v) * (np.abs(v) // self.step) # C++ integer division rounds toward 0
+        return np.clip(v, -self.score_max, self.score_max)
+
+    def predict_int(self, params, features):
+        """Score in discs as the engine computes it from integer parameters."""
+        return self.round_score(params[self.param_idx(features)].sum(axis=1, dtype=np.int64))
+
+def for_version(version=None):
+    info = dataset_registry.version_info(version)
+    if 'definition' not in info:
+        raise KeyError('version ' + str(version) + ' has no pattern definition in datasets.json')
+    return EvalDefinition(info['definition'])
+
+def open_data(files, dtype):
+    """Memory-mapped records of each existing bin_data file."""
+    res = []
+    for file in files:
+        if os.path.isfile(file) and os.path.getsize(file) >= dtype.itemsize:
+            res.append(np.memmap(file, dtype=dtype, mode='r', shape=(os.path.getsize(file) // dtype.itemsize,)))
+    return res
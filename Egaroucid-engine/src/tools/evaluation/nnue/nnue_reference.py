@@ -0,0 +1,109 @@
+"""Reference NNUE evaluator with incremental accumulator updates.
+
+Loads the model_weights.npz written by train_nnue.py and evaluates boards the way an
+engine would: layer A (the accumulator) is kept for both colours and only the rows
+of the squares that change are added or subtracted on each move, then layer B and
+the output layer are computed for the side to move.
+
+Bitboards use Egaroucid's numbering (a1 = bit 63); input i of the net is square
+bit 63 - i of the player (i < 64) or of the opponent (i >= 64).
+
+usage: python nnue_reference.py model_weights.npz [n_games]
+    plays random games and checks the incremental result against a full refresh
+"""
+import sys
+import numpy as np
+
+HW2 = 64
+
+def input_index(bit):
+    return HW2 - 1 - bit
+
+def bits_of(x):
+    res = []
+    while x:
+        lsb = x & -x
+        res.append(lsb.bit_length() - 1)
+        x ^= lsb
+    return res
+
+class NNUEReference:
+
+    def __init__(self, weights_file):
+        w = np.load(weights_file)
+        self.a_kernel = w['layer_A_kernel'].astype(np.float64)
+        self.a_bias = w['layer_A_bias'].astype(np.float64)
+        self.b_kernel = w['layer_B_kernel'].astype(np.float64)
+        self.b_bias = w['layer_B_bias'].astype(np.float64)
+        self.out_kernel = w['output_layer_kernel'].astype(np.float64)
+        self.out_bias = w['output_layer_bias'].astype(np.float64)
+        self.acc = [None, None]  # accumulator seen from black, from white
+        self.side = 0
+
+    def layer_A(self, player, opponent):
+        """Accumulator of a board from scratch."""
+        acc = self.a_bias.copy()
+        for bit in bits_of(player):
+            acc += self.a_kernel[input_index(bit)]
+        for bit in bits_of(opponent):
+            acc += self.a_kernel[HW2 + input_index(bit)]
+        return acc
+
+    def set_board(self, player, opponent, side=0):
+        """player is the side to move; side is its colour (0: black, 1: white)."""
+        self.side = side
+        self.acc[side] = self.layer_A(player, opponent)
+        self.acc[1 - side] = self.layer_A(opponent, player)
+
+    def move(self, pos, flipped):
+        """The side to move plays bit `pos` flipping `flipped`."""
+        own = self.acc[self.side]
+        other = self.acc[1 - self.side]
+        i = input_index(pos)
+        own += self.a_kernel[i]
+        other += self.a_kernel[HW2 + i]
+        for bit in bits_of(flipped):
+            i = input_index(bit)
+            own += self.a_kernel[i] - self.a_kernel[HW2 + i]
+            other += self.a_kernel[HW2 + i] - self.a_kernel[i]
+        self.side = 1 - self.side
+
+    def pass_move(self):
+        self.side = 1 - self.side
+
+    def evaluate(self):
+        """Score for the side to move."""
+        x = np.maximum(self.acc[self.side], 0)
+        x = np.maximum(x @ self.b_kernel + self.b_bias, 0)
+        return float(x @ self.out_kernel[:, 0] + self.out_bias[0])
+
+def main():
+    import os
+    import random
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'util'))
+    from othello_bitboard import calc_legal, calc_flip
+    evaluator = NNUEReference(sys.argv[1])
+    reference = NNUEReference(sys.argv[1])
+    n_games = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    max_err = 0.0
+    for _ in range(n_games):
+        player, opponent = 0x0000000810000000, 0x0000001008000000
+        evaluator.set_board(player, opponent)
+        while True:
+            legal = calc_legal(player, opponent)
+            if not legal:
+                player, opponent = opponent, player
+                evaluator.pass_move()
+                legal = calc_legal(player, opponent)
+                if not legal:
+                    break
+            pos = random.choice(bits_of(legal))
+            flipped = calc_flip(player, opponent, pos)
+            evaluator.move(pos, flipped)
+            player, opponent = opponent ^ flipped, player ^ flipped ^ (1 << pos)
+            reference.set_board(player, opponent, evaluator.side)
+            max_err = max(max_err, abs(evaluator.evaluate() - reference.evaluate()))
+    print('games', n_games, 'max error', max_err)
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,4 @@
-import sys
 import numpy as np
-from tqdm import trange
 
 from tensorflow.keras.layers import Add, Dense, Input, LeakyReLU, ReLU
 from tensorflow.keras.models import Model, load_model
@@ -12,6 +10,7 @@ import tensorflow as tf
 import matplotlib.pyplot as plt
 import datetime
 import os
+import glob
 from random import randrange
 import time
 import pickle
@@ -20,14 +19,146 @@ import pickle
 
 print('tensorflow version', tf_version)
 
+# one board record of records*/N.dat: 19 bytes, native byte order
+RECORD_DTYPE = np.dtype([('player', '=u8'), ('opponent', '=u8'), ('color', 'u1'), ('policy', 'u1'), ('score', 'i1')])
+
+def pop_count(x):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x)
+    return np.unpackbits(x.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+def load_records(file, max_records, min_discs=0, max_discs=64, stop_at_empty=True):
+    """Memory-maps a board record file and returns (inputs, scores) for at most
+    max_records records whose disc count is in [min_discs, max_discs].
+    inputs is uint8 of shape (n, 128): player bits then opponent bits, a1 (bit 63) first.
+    With stop_at_empty, reading ends at the first all-zero board (zero padding)."""
+    n = os.path.getsize(file) // RECORD_DTYPE.itemsize
+    records = np.memmap(file, dtype=RECORD_DTYPE, mode='r', shape=(min(n, max_records),))
+    player = np.asarray(records['player'])
+    opponent = np.asarray(records['opponent'])
+    if stop_at_empty:
+        empty = np.flatnonzero((player | opponent) == 0)
+        if len(empty):
+            player = player[:empty[0]]
+            opponent = opponent[:empty[0]]
+    n_discs = pop_count(player | opponent)
+    use = (min_discs <= n_discs) & (n_discs <= max_discs)
+    boards = np.empty((np.count_nonzero(use), 2), dtype='>u8')
+    boards[:, 0] = player[use]
+    boards[:, 1] = opponent[use]
+    inputs = np.unpackbits(boards.view(np.uint8), axis=1)
+    scores = np.asarray(records['score'][:len(use)][use], dtype=np.int8)
+    del records
+    return inputs, scores
+
+# square permutations of the 8 board symmetries, on the 128 inputs (a1-first)
+def symmetry_permutations():
+    y, x = np.divmod(np.arange(64), 8)
+    perms = []
+    for t in (False, True):
+        ty, tx = (x, y) if t else (y, x)
+        for fy in (False, True):
+            for fx in (False, True):
+                perm = (7 - ty if fy else ty) * 8 + (7 - tx if fx else tx)
+                perms.append(np.concatenate([perm, perm + 64]))
+    return np.array(perms, dtype=np.int32)
+
+SYMMETRY_PERMUTATIONS = symmetry_permutations()
+
+# sparse input: the indices of the active inputs of a board (at most 64 discs),
+# padded with N_INPUT, which the embedding bag maps to a zero row
+N_INPUT = 128
+N_ACTIVE = 64
+
+def to_sparse(inputs):
+    idx = tf.where(inputs > 0, tf.range(N_INPUT, dtype=tf.int32), N_INPUT)
+    return tf.sort(idx, axis=1)[:, :N_ACTIVE]
+
+def to_sparse_np(inputs):
+    idx = np.where(inputs > 0, np.arange(N_INPUT, dtype=np.int32), N_INPUT)
+    return np.sort(idx, axis=1)[:, :N_ACTIVE]
+
+class EmbeddingBag(tf.keras.layers.Layer):
+    """First layer for sparse input: bias plus the sum of the kernel rows of the
+    active inputs, i.e. Dense(units) on the 0/1 vector without the zero products.
+    The kernel has the same (128, units) shape as the dense layer_A."""
+
+    def __init__(self, units, activation=None, **kwargs):
+        super().__init__(**kwargs)
+        self.units = units
+        self.activation = tf.keras.activations.get(activation)
+
+    def build(self, input_shape):
+        self.kernel = self.add_weight(name='kernel', shape=(N_INPUT, self.units), initializer='glorot_uniform')
+        self.bias = self.add_weight(name='bias', shape=(self.units,), initializer='zeros')
+
+    def call(self, idx):
+        table = tf.concat([self.kernel, tf.zeros((1, self.units), self.kernel.dtype)], axis=0)
+        return self.activation(tf.reduce_sum(tf.gather(table, idx), axis=1) + self.bias)
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({'units': self.units, 'activation': tf.keras.activations.serialize(self.activation)})
+        return config
+
+def decode_records(raw, min_discs, max_discs, augment, sparse):
+    """Decodes a batch of raw 19-byte records into (inputs, scores) like load_records,
+    dropping zero padding and boards outside [min_discs, max_discs]. With sparse,
+    inputs are active-input indices (to_sparse) instead of the dense vector."""
+    raw = tf.io.decode_raw(raw, tf.uint8)
+    # player and opponent are stored in native (little endian) order; read them MSB first
+    board_bytes = tf.gather(raw, list(range(7, -1, -1)) + list(range(15, 7, -1)), axis=1)
+    bits = tf.bitwise.bitwise_and(tf.bitwise.right_shift(board_bytes[:, :, None], tf.constant([7, 6, 5, 4, 3, 2, 1, 0], tf.uint8)), 1)
+    inputs = tf.reshape(bits, (-1, 128))
+    scores = tf.cast(tf.bitcast(raw[:, 18], tf.int8), tf.float32)
+    n_discs = tf.reduce_sum(tf.cast(inputs, tf.int32), axis=1)
+    use = (n_discs >= max(min_discs, 1)) & (n_discs <= max_discs)
+    inputs = tf.boolean_mask(inputs, use)
+    scores = tf.boolean_mask(scores, use)
+    if augment:
+        sym = tf.random.uniform((tf.shape(inputs)[0],), maxval=8, dtype=tf.int32)
+        inputs = tf.gather(inputs, tf.gather(SYMMETRY_PERMUTATIONS, sym), batch_dims=1)
+    if sparse:
+        return to_sparse(inputs), scores
+    return tf.cast(inputs, tf.float32), scores
+
+def record_dataset(files, batch_size, shuffle_buffer=1000000, min_discs=0, max_discs=64, augment=True, sparse=False, repeat=False):
+    """Streams the given record files: files are visited in random order and read
+    lazily a few at a time, records go through a bounded shuffle buffer, and batches
+    are decoded, filtered, augmented with a random symmetry and prefetched.
+    With repeat, the files are visited again (in a new order) without end."""
+    ds = tf.data.Dataset.from_tensor_slices(files).shuffle(len(files))
+    if repeat:
+        ds = ds.repeat()
+    ds = ds.interleave(lambda file: tf.data.FixedLengthRecordDataset(file, RECORD_DTYPE.itemsize), cycle_length=8, num_parallel_calls=tf.data.AUTOTUNE)
+    ds = ds.shuffle(shuffle_buffer)
+    ds = ds.batch(batch_size)
+    ds = ds.map(lambda raw: decode_records(raw, min_discs, max_discs, augment, sparse), num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
 '''
 def ClippedReLU(x):
     return tf.keras.backend.relu(x, max_value=1)
 '''
 
+def export_weights(model, file):
+    """Saves the weights by layer name for nnue_reference.py; the sparse and dense
+    models produce the same arrays."""
+    weights = {}
+    for layer in model.layers:
+        for name, value in zip(('kernel', 'bias'), layer.get_weights()):
+            weights[layer.name + '_' + name] = value
+    np.savez(file, **weights)
+
+SPARSE_INPUT = True
+
 model = tf.keras.models.Sequential()
-model.add(Input(shape=128, name='in'))
-model.add(Dense(32, activation='relu', name='layer_A'))
+if SPARSE_INPUT:
+    model.add(Input(shape=(N_ACTIVE,), dtype='int32', name='in'))
+    model.add(EmbeddingBag(32, activation='relu', name='layer_A'))
+else:
+    model.add(Input(shape=(N_INPUT,), name='in'))
+    model.add(Dense(32, activation='relu', name='layer_A'))
 model.add(Dense(32, activation='relu', name='layer_B'))
 #model.add(Dense(16, activation='relu', name='layer_C'))
 #model.add(Dense(16, activation='relu', name='layer_D'))
@@ -38,114 +169,37 @@ plot_model(model, to_file='./model.png', show_shapes=True)
 model.summary()
 model.compile(loss='mse', metrics='mae', optimizer='adam')
 
-train_data = []
-train_labels = []
-for num in range(1): # 4
-    strt = len(train_data)
-    print(num, strt)
-    with open('E:/github/othello/Egaroucid/train_data/board_data/records29/' + str(num) + '.dat', 'br') as f:
-        #while len(train_data) - strt < 80000:
-        for _ in trange(2000000):
-            bits = int.from_bytes(f.read(8), sys.byteorder) << 64
-            bits |= int.from_bytes(f.read(8), sys.byteorder)
-            if bits == 0:
-                break
-            in_data = np.zeros(128)
-            n_discs = 0
-            for i in range(128):
-                in_data[i] = (1 & (bits >> (127 - i)))
-                if in_data[i]:
-                    n_discs += 1
-            f.read(2)
-            score = int.from_bytes(f.read(1), sys.byteorder, signed=True)
-            #if n_discs == 4 + 30:
-            if n_discs >= 4 + 12:
-                train_data.append(in_data)
-                train_labels.append(score)
-                #if len(train_data) % 10000 == 0:
-                #    print(num, len(train_data))
-            '''
-            for i in range(2):
-                for j in range(8):
-                    s = i * 64 + j * 8
-                    print(in_data[s:s+8])
-                if i == 0:
-                    print('')
-            print(score)
-            print('')
-            '''
-
-with open('E:/github/othello/Egaroucid/train_data/board_data/records26/0.dat', 'br') as f:
-    for _ in trange(2000000 // 4):
-        bits = int.from_bytes(f.read(8), sys.byteorder) << 64
-        bits |= int.from_bytes(f.read(8), sys.byteorder)
-        if bits == 0:
-            break
-        in_data = np.zeros(128)
-        n_discs = 0
-        for i in range(128):
-            in_data[i] = (1 & (bits >> (127 - i)))
-            if in_data[i]:
-                n_discs += 1
-        f.read(2)
-        score = int.from_bytes(f.read(1), sys.byteorder, signed=True)
-        #if n_discs >= 4 + 12:
-        train_data.append(in_data)
-        train_labels.append(score)
-
-train_data = np.array(train_data)
-train_labels = np.array(train_labels)
-print('data loaded', len(train_data), len(train_labels))
-
-
-
-test_data = []
-test_labels = []
-with open('E:/github/othello/Egaroucid/train_data/board_data/records29/4.dat', 'br') as f:
-    for _ in trange(100000):
-        bits = int.from_bytes(f.read(8), sys.byteorder) << 64
-        bits |= int.from_bytes(f.read(8), sys.byteorder)
-        in_data = np.zeros(128)
-        n_discs = 0
-        for i in range(128):
-            in_data[i] = (1 & (bits >> (127 - i)))
-            if in_data[i]:
-                n_discs += 1
-        f.read(2)
-        score = int.from_bytes(f.read(1), sys.byteorder, signed=True)
-        #if n_discs >= 4 + 12:
-        if n_discs == 4 + 30:
-            test_data.append(in_data)
-            test_labels.append(score)
-        '''
-        for i in range(2):
-            for j in range(8):
-                s = i * 64 + j * 8
-                print(in_data[s:s+8])
-            if i == 0:
-                print('')
-        print(score)
-        print('')
-        '''
-test_data = np.array(test_data)
-test_labels = np.array(test_labels)
-print('data loaded', len(test_data), len(test_labels))
-
-
-
-
-
 N_EPOCHS = 500
 BATCH_SIZE = 2048
 EARLY_STOP_PATIENCE = 100
+SHUFFLE_BUFFER = 1000000
+# the stream never ends, so an epoch is a fixed number of batches: about the
+# 2.5M records the in-memory training set had, which N_EPOCHS and
+# EARLY_STOP_PATIENCE were chosen for (validation runs after each epoch)
+RECORDS_PER_EPOCH = 2500000
+STEPS_PER_EPOCH = RECORDS_PER_EPOCH // BATCH_SIZE
+
+board_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/board_data/'
+test_file = board_root_dir + 'records29/4.dat'
+
+train_files = sorted(glob.glob(board_root_dir + 'records*/*.dat'))
+train_files = [file for file in train_files if os.path.abspath(file) != os.path.abspath(test_file)]
+train_dataset = record_dataset(train_files, BATCH_SIZE, SHUFFLE_BUFFER, min_discs=4 + 12, sparse=SPARSE_INPUT, repeat=True)
+print('train files', len(train_files), sum(os.path.getsize(file) for file in train_files) // RECORD_DTYPE.itemsize, 'records')
+
+test_data, test_labels = load_records(test_file, 100000, min_discs=4 + 30, max_discs=4 + 30, stop_at_empty=False)
+if SPARSE_INPUT:
+    test_data = to_sparse_np(test_data)
+print('data loaded', len(test_data), len(test_labels))
 
 # train
 early_stop = EarlyStopping(monitor='val_loss', patience=EARLY_STOP_PATIENCE)
 #model_checkpoint = ModelCheckpoint(filepath=os.path.join('./../model/', 'model_{epoch:02d}_{loss:.4f}_{mae:.4f}_{val_loss:.4f}_{val_mae:.4f}.h5'), monitor='val_loss', verbose=1, period=1)
 #reduce_lr = ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=2, min_lr=0.0001)
-history = model.fit(train_data, train_labels, initial_epoch=0, epochs=N_EPOCHS, batch_size=BATCH_SIZE, callbacks=[early_stop], validation_data=(test_data, test_labels))
+history = model.fit(train_dataset, initial_epoch=0, epochs=N_EPOCHS, steps_per_epoch=STEPS_PER_EPOCH, callbacks=[early_stop], validation_data=(test_data, test_labels))
 
 model.save('./model.h5')
+export_weights(model, './model_weights.npz')
 
 
 
@@ -0,0 +1,79 @@
+"""Test loss of a trained model, computed in-process with NumPy.
+
+load_eval reads eval.egev2 (or the uncompressed eval.egev) once into an int16 array
+of shape [phases][evals][idx]; data_loss then scores memory-mapped bin_data files
+with the integer arithmetic of test_loss.cpp. Each (phase, dataset) file is read
+only once however many test sets share it.
+"""
+import numpy as np
+import evaluation_definition
+
+N_ZEROS_PLUS = 1 << 12 # egev2 zero-run marker (output_egev2.cpp)
+BATCH_SIZE = 1 << 18
+
+def unzip_egev2(file):
+    with open(file, 'rb') as f:
+        n = int(np.frombuffer(f.read(4), dtype='<i4')[0])
+        zipped = np.frombuffer(f.read(2 * n), dtype='<i2')
+    if len(zipped) < n:
+        raise ValueError('evaluation file broken ' + file)
+    # each element >= N_ZEROS_PLUS stands for (element - N_ZEROS_PLUS) zeros
+    is_run = zipped >= N_ZEROS_PLUS
+    lengths = np.where(is_run, zipped.astype(np.int64) - N_ZEROS_PLUS, 1)
+    return np.repeat(np.where(is_run, 0, zipped), lengths).astype(np.int16)
+
+def load_eval(file, definition):
+    """Parameters as [phases][evals][idx] (idx padded to the largest eval)."""
+    if file.endswith('.egev2'):
+        flat = unzip_egev2(file)
+    else:
+        flat = np.fromfile(file, dtype='<i2')
+    if len(flat) < definition.n_phases * definition.n_params:
+        raise ValueError('evaluation file broken ' + file + ': ' + str(len(flat)) + ' params, expected ' + str(definition.n_phases * definition.n_params))
+    flat = flat[:definition.n_phases * definition.n_params].reshape(definition.n_phases, definition.n_params)
+    res = np.zeros((definition.n_phases, definition.n_eval, int(definition.eval_sizes.max())), dtype=np.int16)
+    for i in range(definition.n_eval):
+        start = definition.eval_start_idx[i]
+        res[:, i, :definition.eval_sizes[i]] = flat[:, start:start + definition.eval_sizes[i]]
+    return res
+
+def data_loss(eval_arr, phase, file, definition):
+    """(n_data, sum of squared errors, sum of absolute errors) of one bin_data file."""
+    data = evaluation_definition.open_data([file], definition.record_dtype())
+    if not data:
+        return 0, 0.0, 0.0
+    phase_arr = eval_arr[phase].astype(np.int64)
+    eval_idx = definition.feature_to_eval_idx[np.newaxis, :]
+    n = 0
+    se = ae = 0.0
+    for start in range(0, len(data[0]), BATCH_SIZE):
+        records = np.asarray(data[0][start:start + BATCH_SIZE])
+        predicted = definition.round_score(phase_arr[eval_idx, records['features']].sum(axis=1))
+        error = np.abs(records['score'].astype(np.int64) - predicted)
+        n += len(records)
+        se += float((error * error).sum())
+        ae += float(error.sum())
+    return n, se, ae
+
+def test_loss(eval_arr, tasks, data_root_dir, definition, log=None):
+    """tasks: {name: [dataset numbers of each phase]}. Returns {name: [(n_data, mse, mae) per phase]}."""
+    res = {task: [] for task in tasks}
+    for phase in range(definition.n_phases):
+        file_loss = {}
+        for nums in tasks.values():
+            for num in nums[phase]:
+                if num not in file_loss:
+                    file = data_root_dir + str(phase) + '/' + str(num) + '.dat'
+                    file_loss[num] = data_loss(eval_arr, phase, file, definition)
+                    if log:
+                        log(file + ' ' + str(file_loss[num][0]))
+        for task, nums in tasks.items():
+            n = sum(file_loss[num][0] for num in nums[phase])
+            se = sum(file_loss[num][1] for num in nums[phase])
+            ae = sum(file_loss[num][2] for num in nums[phase])
+            res[task].append((n, se / n if n else float('nan'), ae / n if n else float('nan')))
+    return res
+
+def format_line(phase, n_data, mse, mae):
+    """The output line of test_loss.cpp."""
+    return 'phase ' + str(phase) + ' n_data ' + str(n_data) + ' mse ' + format(mse, 'g') + ' mae ' + format(mae, 'g')
@@ -1,92 +1,53 @@
 import subprocess
 import os
+import sys
+import argparse
+import dataset_registry
 
-''' # 7.0
-N_PHASES = 60
-data_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/20240223_1/'
-exe = 'test_loss.out'
-eval_file = 'trained/eval.egev'
-data_nums = []
-for _ in range(12):
-    data_nums.append([36])
-for _ in range(12, 61):
-    data_nums.append([38])
-'''
-''' # 7.1 not used
-N_PHASES = 60
-data_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/20240525_1/'
-exe = 'test_loss_20240525_1.out'
-eval_file = 'trained/eval.egev'
-data_nums = []
-for _ in range(12):
-    data_nums.append([36])
-for _ in range(12, 61):
-    data_nums.append([38])
-'''
-''' # 7.0 light
-N_PHASES = 60
-data_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/20240622_1_7_0_light/'
-exe = 'test_loss_20240622_1_7_0_light.out'
-eval_file = 'trained/eval.egev'
-data_nums = []
-for _ in range(12):
-    data_nums.append([36])
-for _ in range(12, 61):
-    data_nums.append([38])
-'''
+parser = argparse.ArgumentParser()
+parser.add_argument('--version', type=str, default=dataset_registry.default_version, help='eval version in datasets.json')
+parser.add_argument('--eval_file', type=str, default=None, help='default: trained/eval.egev2, or trained/eval.egev with --native')
+parser.add_argument('--native', action='store_true', help='run test_loss.out once per phase and task instead of test_loss.py')
+args = parser.parse_args()
 
-''' # 7.4
-N_PHASES = 60
-data_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/20240925_1/'
-exe = 'test_loss_20240925_1_7_4.out'
-eval_file = 'trained/eval.egev'
-data_nums = []
-for _ in range(12):
-    data_nums.append([36])
-for _ in range(12, 61):
-    data_nums.append([38])
-#'''
+version_info = dataset_registry.version_info(args.version)
+N_PHASES = version_info['n_phases']
+data_root_dir = dataset_registry.bin_root_dir(args.version)
 
+# every test_<name> recipe of the version is written to trained/test_<name>.txt
+tasks = [recipe[len('test_'):] for recipe in version_info['recipes'] if recipe.startswith('test_')]
+data_nums = {task: [dataset_registry.recipe_datasets('test_' + task, phase, args.version) for phase in range(N_PHASES)] for task in tasks}
 
-#''' # 7.5
-N_PHASES = 60
-data_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/20241125_1/'
-exe = 'test_loss_20241125_1_7_5.out'
-#'''
-
-
-
-''' # 7.7
-N_PHASES = 60
-data_root_dir = os.environ['EGAROUCID_DATA'] + '/train_data/bin_data/20250513_1/'
-exe = 'test_loss_20250513_1_7_7.out'
-#'''
-
-
-eval_file = 'trained/eval.egev'
-
-tasks = [
-    ['random', [166, 215]],
-    ['drawline', [167]],
-]
-
-for task in tasks:
-    data_nums = [[] for _ in range(60)]
-    for i in range(60):
-        for data_num in task[1]:
-            data_nums[i].append(data_num)
-
-    res = ''
-    for phase in range(N_PHASES):
-        cmd = exe + ' ' + eval_file + ' ' + str(phase)
-        for num in data_nums[phase]:
-            cmd += ' ' + data_root_dir + str(phase) + '/' + str(num) + '.dat'
-        print(cmd)
-        p = subprocess.run(cmd, stdout=subprocess.PIPE)
-        out = p.stdout.decode().replace('\r', '').replace('\n', '')
-        res += out + '\n'
+def write_result(task, res):
     print('')
     print('all done')
     print(res)
-    with open('trained/test_' + task[0] + '.txt', 'w') as f:
-        f.write(res)
\ No newline at end of file
+    with open('trained/test_' + task + '.txt', 'w') as f:
+        f.write(res)
+
+if args.native or 'definition' not in version_info:
+    # versions without a pattern definition in datasets.json only have the C++ tool
+    exe = version_info['test_loss']
+    eval_file = args.eval_file or 'trained/eval.egev'
+    for task in tasks:
+        res = ''
+        for phase in range(N_PHASES):
+            cmd = exe + ' ' + eval_file + ' ' + str(phase)
+            for num in data_nums[task][phase]:
+                cmd += ' ' + data_root_dir + str(phase) + '/' + str(num) + '.dat'
+            print(cmd)
+            p = subprocess.run(cmd, stdout=subprocess.PIPE)
+            out = p.stdout.decode().replace('\r', '').replace('\n', '')
+            res += out + '\n'
+        write_result(task, res)
+else:
+    import evaluation_definition
+    import test_loss
+    definition = evaluation_definition.for_version(args.version)
+    eval_file = args.eval_file or 'trained/eval.egev2'
+    eval_arr = test_loss.load_eval(eval_file, definition)
+    print(eval_file, 'loaded', file=sys.stderr)
+    result = test_loss.test_loss(eval_arr, data_nums, data_root_dir, definition, log=lambda line: print(line, file=sys.stderr))
+    for task in tasks:
+        res = ''.join(test_loss.format_line(phase, *result[task][phase]) + '\n' for phase in range(N_PHASES))
+        write_result(task, res)
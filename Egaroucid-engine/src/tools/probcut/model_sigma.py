@@ -5,7 +5,7 @@ from random import random, randrange
 import numpy as np
 from scipy.optimize import curve_fit
 from matplotlib import animation
-import math
+import probcut_stats
 
 #depth1: short
 #depth2: long
@@ -35,78 +35,37 @@ import math
 # data_files = ['data/20250916_7_8_20250915_1/probcut_mid0.txt', 'data/20250916_7_8_20250915_1/probcut_mid1.txt']
 # data_files_end = ['data/20250916_7_8_20250915_1/probcut_end0.txt', 'data/20250916_7_8_20250915_1/probcut_end1.txt', 'data/20250916_7_8_20250915_1/probcut_end2.txt']
 
+data_version = '20250918_7_8_20250917_1' # sums are kept in data/<data_version>/probcut_stats.npz
 data_files = ['data/20250918_7_8_20250917_1/probcut_mid0.txt']
 data_files_end = ['data/20250918_7_8_20250917_1/probcut_end0.txt', 'data/20250918_7_8_20250917_1/probcut_end1.txt']
 
 
-data = [[[[] for _ in range(61)] for _ in range(61)] for _ in range(65)] # n_discs, depth1, depth2 (depth1 < depth2)
-
-for data_file in data_files:
-    try:
-        with open(data_file, 'r') as f:
-            raw_data = f.read().splitlines()
-        for datum in raw_data:
-            n_discs, depth1, depth2, error = [int(elem) for elem in datum.split()]
-            if depth2 > 1:
-                data[n_discs][depth1][depth2].append(error)
-    except:
-        print('cannot open', data_file)
-
-for data_file in data_files_end:
-    try:
-        with open(data_file, 'r') as f:
-            raw_data = f.read().splitlines()
-        for datum in raw_data:
-            n_discs, depth1, error = [int(elem) for elem in datum.split()]
-            depth2 = 64 - n_discs
-            data[n_discs][depth1][depth2].append(error)
-    except:
-        print('cannot open', data_file)
-
-w_n_discs_sd = []
-x_depth1_sd = []
-y_depth2_sd = []
-z_sd = []
-weight_sd = []
-
-w_n_discs_mean = []
-x_depth1_mean = []
-y_depth2_mean = []
-z_mean = []
-weight_mean = []
-
-for n_discs in range(len(data)):
-    #for n_discs in range(4 + 12, 51):
-    for depth1 in range(len(data[n_discs])): # short
-        for depth2 in range(len(data[n_discs][depth1])): # long
-            if len(data[n_discs][depth1][depth2]) >= 3:
-                '''
-                mean = statistics.mean(data[n_discs][depth1][depth2])
-                sd = statistics.stdev(data[n_discs][depth1][depth2])
-                #'''
-                #'''
-                mean = 0.0
-                sd = 0.0
-                for elem in data[n_discs][depth1][depth2]:
-                    sd += elem ** 2
-                sd = math.sqrt(sd / len(data[n_discs][depth1][depth2]))
-                #'''
-                #print('n_discs', n_discs, 'depth1', depth1, 'depth2', depth2, 'mean', mean, 'sd', sd, 'n_data', len(data[n_discs][depth1][depth2]))
-
-                w_n_discs_sd.append(n_discs)
-                x_depth1_sd.append(depth1)
-                y_depth2_sd.append(depth2)
-                z_sd.append(sd)
-                if depth2 == 64 - n_discs:
-                    weight_sd.append(0.0001)
-                else:
-                    weight_sd.append(0.001)
-
-                w_n_discs_mean.append(n_discs)
-                x_depth1_mean.append(depth1)
-                y_depth2_mean.append(depth2)
-                z_mean.append(mean)
-                weight_mean.append(0.001)
+# per (n_discs, depth1, depth2) count / sum / sum of squares of the errors (depth1 < depth2)
+store = probcut_stats.ProbcutStore(data_version)
+store.merge(data_files)
+store.merge(data_files_end, end=True)
+store.save()
+stats_mid = store.stats(data_files)
+for elem in stats_mid:
+    elem[:, :, :2] = 0 # depth2 > 1 only
+stats_end = store.stats(data_files_end)
+stats = tuple(mid + end for mid, end in zip(stats_mid, stats_end))
+
+n_discs_arr, depth1_arr, depth2_arr, n_data_arr, mean_arr, sd_arr = probcut_stats.cells(stats, min_count=3)
+#for n_discs, depth1, depth2, sd, n_data in zip(n_discs_arr, depth1_arr, depth2_arr, sd_arr, n_data_arr):
+#    print('n_discs', n_discs, 'depth1', depth1, 'depth2', depth2, 'mean', 0.0, 'sd', sd, 'n_data', n_data)
+
+w_n_discs_sd = n_discs_arr.tolist()
+x_depth1_sd = depth1_arr.tolist()
+y_depth2_sd = depth2_arr.tolist()
+z_sd = sd_arr.tolist()
+weight_sd = np.where(depth2_arr == 64 - n_discs_arr, 0.0001, 0.001).tolist()
+
+w_n_discs_mean = n_discs_arr.tolist()
+x_depth1_mean = depth1_arr.tolist()
+y_depth2_mean = depth2_arr.tolist()
+z_mean = [0.0 for _ in z_sd]
+weight_mean = [0.001 for _ in z_sd]
 
 #'''
 for n_discs in range(4, 30):
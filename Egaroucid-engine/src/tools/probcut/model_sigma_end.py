@@ -5,7 +5,7 @@ from random import random, randrange
 import numpy as np
 from scipy.optimize import curve_fit
 from matplotlib import animation
-import math
+import probcut_stats
 
 #data_files = ['data/probcut_end1.txt', 'data/probcut_end2.txt', 'data/probcut_end3.txt', 'data/probcut_end4.txt']
 #data_files = ['data/probcut_end6.txt']
@@ -16,6 +16,7 @@ import math
 #data_files = ['data/20240925_1_7_4/probcut_end0.txt']
 #data_files = ['data/20241118_1_7_5/probcut_end0.txt']
 #data_files = ['data/20241128_1_7_5/probcut_end0.txt']
+data_version = '20241130_1_7_5' # sums are kept in data/<data_version>/probcut_stats.npz
 data_files = ['data/20241130_1_7_5/probcut_end0.txt', 'data/20241130_1_7_5/probcut_end1.txt', 'data/20241130_1_7_5/probcut_end2.txt']
 
 
@@ -30,53 +31,28 @@ def mid_f(wxy, probcut_a, probcut_b, probcut_c, probcut_d, probcut_e, probcut_f,
     res = probcut_d * res * res * res + probcut_e * res * res + probcut_f * res + probcut_g
     return res
 
-data = [[[] for _ in range(61)] for _ in range(65)] # n_discs, depth, error (exact - predict)
-for data_file in data_files:
-    try:
-        with open(data_file, 'r') as f:
-            raw_data = f.read().splitlines()
-        for datum in raw_data:
-            n_discs, depth, error = [int(elem) for elem in datum.split()]
-            data[n_discs][depth].append(error)
-    except:
-        print('cannot open', data_file)
-x_n_discs_sd = []
-y_depth_sd = []
-z_sd = []
-weight_sd = []
-
-x_n_discs_mean = []
-y_depth_mean = []
-z_mean = []
-weight_mean = []
-
-
-for n_discs in range(len(data)):
-    if n_discs >= 64 - 12:
-        continue
-    for depth in range(3, len(data[n_discs])):
-        if len(data[n_discs][depth]) >= 3:
-            '''
-            mean = statistics.mean(data[n_discs][depth])
-            sd = statistics.stdev(data[n_discs][depth])
-            '''
-            mean = 0.0
-            sd = 0.0
-            for elem in data[n_discs][depth]:
-                sd += (elem - mean) ** 2
-            sd = math.sqrt(sd / len(data[n_discs][depth]))
-            
-
-            print('n_discs', n_discs, 'depth', depth, 'mean', mean, 'sd', sd, 'n_data', len(data[n_discs][depth]))
-            x_n_discs_sd.append(n_discs)
-            y_depth_sd.append(depth)
-            z_sd.append(sd)
-            weight_sd.append(1 / len(data[n_discs][depth]))
-            
-            x_n_discs_mean.append(n_discs)
-            y_depth_mean.append(depth)
-            z_mean.append(mean)
-            weight_mean.append(1 / len(data[n_discs][depth]))
+# per (n_discs, depth) count / sum / sum of squares of the errors (exact - predict)
+store = probcut_stats.ProbcutStore(data_version)
+store.merge(data_files, end=True)
+store.save()
+stats = store.stats(data_files)
+for elem in stats:
+    elem[64 - 12:] = 0
+    elem[:, :3] = 0
+
+n_discs_arr, depth_arr, _, n_data_arr, mean_arr, sd_arr = probcut_stats.cells(stats, min_count=3)
+for n_discs, depth, sd, n_data in zip(n_discs_arr, depth_arr, sd_arr, n_data_arr):
+    print('n_discs', n_discs, 'depth', depth, 'mean', 0.0, 'sd', sd, 'n_data', n_data)
+
+x_n_discs_sd = n_discs_arr.tolist()
+y_depth_sd = depth_arr.tolist()
+z_sd = sd_arr.tolist()
+weight_sd = (1 / n_data_arr).tolist()
+
+x_n_discs_mean = n_discs_arr.tolist()
+y_depth_mean = depth_arr.tolist()
+z_mean = [0.0 for _ in z_sd]
+weight_mean = (1 / n_data_arr).tolist()
 
 for n_discs in range(1):
     for depth in range(1):
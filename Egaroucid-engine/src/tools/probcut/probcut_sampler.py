@@ -0,0 +1,228 @@
+"""Probcut error samples generated with Egaroucid for Console.
+
+Positions are drawn from the NNUE board records (records*/*.dat) and searched by
+a pool of long-lived console processes, one per thread, at a short and a long
+depth. Every (n_discs, depth1, depth2) bucket keeps sampling until the standard
+error of its sigma estimate is small enough, and the errors go straight into
+data/<version>/probcut_stats.npz (see probcut_stats.py) as the stream source
+sampler_mid or sampler_end.
+
+Depths are console levels, which only search with MPC 100% up to level 10, so
+depth2 <= 10 and level L solves positions with 2L or less empties exactly:
+    mid: error = value at depth2 - value at depth1, 64 - n_discs > 2 * depth2
+    end: error = exact value - value at depth1, 64 - n_discs <= 20
+
+    python probcut_sampler.py 20250918_7_8_20250917_1 --engine Egaroucid_for_Console.exe --jobs 8
+"""
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import probcut_stats
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'util'))
+import othello_bitboard_np
+
+# one board record of records*/N.dat (evaluation/nnue/train_nnue.py)
+RECORD_DTYPE = np.dtype([('player', '=u8'), ('opponent', '=u8'), ('color', 'u1'), ('policy', 'u1'), ('score', 'i1')])
+MAX_MPC_100_LEVEL = 10
+
+parser = argparse.ArgumentParser()
+parser.add_argument('version', type=str, help='folder in data/ where probcut_stats.npz is kept')
+parser.add_argument('--mode', type=str, default='mid', choices=['mid', 'end'])
+parser.add_argument('--engine', type=str, default='Egaroucid_for_Console.exe')
+parser.add_argument('--eval_file', type=str, default=None, help='passed to the engine with -eval')
+parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='engine processes')
+parser.add_argument('--hash_level', type=int, default=20, help='engine -hash; the table is cleared before every search')
+parser.add_argument('--records', type=str, default=None, help='glob of board records (default: $EGAROUCID_DATA/train_data/board_data/records*/*.dat)')
+parser.add_argument('--n_boards', type=int, default=1 << 20, help='boards read from the records')
+parser.add_argument('--max_depth', type=int, default=MAX_MPC_100_LEVEL, help='largest depth2 (mid) or empties / 2 (end)')
+parser.add_argument('--min_samples', type=int, default=30)
+parser.add_argument('--max_samples', type=int, default=2000)
+parser.add_argument('--precision', type=float, default=0.25, help='a bucket is done when the standard error of its sigma is below this many discs')
+parser.add_argument('--rel_precision', type=float, default=0.05, help='... or below this ratio of sigma')
+parser.add_argument('--save_interval', type=float, default=60.0, help='seconds between saves of the store')
+parser.add_argument('--seed', type=int, default=None)
+args = parser.parse_args()
+
+if args.max_depth > MAX_MPC_100_LEVEL:
+    print('levels above', MAX_MPC_100_LEVEL, 'use selective search, max_depth set to', MAX_MPC_100_LEVEL, file=sys.stderr)
+    args.max_depth = MAX_MPC_100_LEVEL
+
+def buckets(mode, max_depth):
+    """(n_discs, depth1, depth2, long level) to sample. depth1 has the parity of depth2."""
+    res = []
+    if mode == 'mid':
+        for depth2 in range(3, max_depth + 1):
+            for depth1 in range(2 - depth2 % 2, depth2 - 1, 2):
+                for n_discs in range(4, 64 - 2 * depth2):
+                    res.append((n_discs, depth1, depth2, depth2))
+    else:
+        for n_empties in range(2, 2 * max_depth + 1):
+            for depth1 in range(2 - n_empties % 2, (n_empties + 1) // 2, 2): # 2 * depth1 < n_empties: midgame search
+                res.append((64 - n_empties, depth1, n_empties, (n_empties + 1) // 2))
+    return res
+
+def load_boards(files, n_boards, rng):
+    """Random boards with a legal move, as {n_discs: (player, opponent)}."""
+    per_file = max(1, n_boards // len(files))
+    player = []
+    opponent = []
+    for file in files:
+        n = os.path.getsize(file) // RECORD_DTYPE.itemsize
+        if n == 0:
+            continue
+        records = np.memmap(file, dtype=RECORD_DTYPE, mode='r', shape=(n,))
+        idx = np.sort(rng.choice(n, size=min(n, per_file), replace=False))
+        player.append(np.asarray(records['player'][idx]))
+        opponent.append(np.asarray(records['opponent'][idx]))
+    player = np.concatenate(player)
+    opponent = np.concatenate(opponent)
+    use = othello_bitboard_np.calc_legal(player, opponent) != 0
+    player = player[use]
+    opponent = opponent[use]
+    n_discs = othello_bitboard_np.pop_count(player | opponent).astype(np.int64)
+    return {n: (player[n_discs == n], opponent[n_discs == n]) for n in np.unique(n_discs).tolist()}
+
+def board_str(player, opponent):
+    """setboard argument, the side to move as X (a1 = bit 63)."""
+    res = ''
+    for i in range(64):
+        bit = 1 << (63 - i)
+        res += 'X' if player & bit else 'O' if opponent & bit else '-'
+    return res + ' X'
+
+class Engine:
+    def __init__(self, cmd):
+        self.p = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def search(self, board, level):
+        """Value of the board for the side to move.
+
+        The transposition table is cleared first: it hands bounds stored by deeper
+        searches to shallower ones, so a short search after a long one on the same
+        board would return (close to) the long value and shrink the error."""
+        self.p.stdin.write(('clearcache\nlevel ' + str(level) + '\nsetboard ' + board + '\ngo\n').encode())
+        self.p.stdin.flush()
+        line = self.p.stdout.readline().decode()
+        if not line:
+            raise RuntimeError('engine terminated')
+        return int(line.split()[-1]) # prompts may precede "<move> <value>"
+
+    def close(self):
+        try:
+            self.p.stdin.write(b'exit\n')
+            self.p.stdin.close()
+        except OSError:
+            pass
+        self.p.wait()
+
+class Sampler:
+    def __init__(self, store, source, bucket_list, boards):
+        self.store = store
+        self.source = source
+        self.boards = boards
+        count, _, sumsq = store.stats([source])
+        self.buckets = [elem for elem in bucket_list if elem[0] in boards]
+        self.count = {elem: int(count[elem[:3]]) for elem in self.buckets}
+        self.sumsq = {elem: float(sumsq[elem[:3]]) for elem in self.buckets}
+        self.running = {elem: 0 for elem in self.buckets}
+        self.pending = [] # (n_discs, depth1, depth2, error) not yet in the store
+        self.lock = threading.Lock()
+        self.n_new = 0
+        self.last_save = time.time()
+
+    def converged(self, bucket):
+        n = self.count[bucket]
+        if n >= args.max_samples:
+            return True
+        if n < args.min_samples:
+            return False
+        sigma = (self.sumsq[bucket] / n) ** 0.5
+        return sigma / (2 * n) ** 0.5 <= max(args.precision, args.rel_precision * sigma) # standard error of sigma for normal errors
+
+    def next_bucket(self):
+        """The open bucket with the fewest samples, or None when all have converged."""
+        with self.lock:
+            open_buckets = [elem for elem in self.buckets if not self.converged(elem)]
+            if not open_buckets:
+                return None
+            bucket = min(open_buckets, key=lambda elem: self.count[elem] + self.running[elem])
+            self.running[bucket] += 1
+            return bucket
+
+    def add(self, bucket, error):
+        with self.lock:
+            self.running[bucket] -= 1
+            self.count[bucket] += 1
+            self.sumsq[bucket] += error * error
+            self.pending.append(bucket[:3] + (error,))
+            self.n_new += 1
+            if time.time() - self.last_save >= args.save_interval:
+                self.save()
+
+    def save(self):
+        if self.pending:
+            self.store.add(self.source, *np.array(self.pending, dtype=np.int64).T)
+            self.pending = []
+        self.store.save()
+        self.last_save = time.time()
+        n_open = sum(not self.converged(elem) for elem in self.buckets)
+        print(self.n_new, 'samples', n_open, '/', len(self.buckets), 'buckets open', file=sys.stderr)
+
+    def work(self, engine, rng):
+        while True:
+            bucket = self.next_bucket()
+            if bucket is None:
+                return
+            n_discs, depth1, _, long_level = bucket
+            player, opponent = self.boards[n_discs]
+            i = rng.integers(len(player))
+            board = board_str(int(player[i]), int(opponent[i]))
+            short_value = engine.search(board, depth1) # short first, as get_data_probcut_mid
+            error = engine.search(board, long_level) - short_value
+            self.add(bucket, error)
+
+rng = np.random.default_rng(args.seed)
+records = args.records or os.environ['EGAROUCID_DATA'] + '/train_data/board_data/records*/*.dat'
+files = sorted(glob.glob(records))
+if not files:
+    print('no records found at', records, file=sys.stderr)
+    sys.exit(1)
+boards = load_boards(files, args.n_boards, rng)
+print(sum(len(elem[0]) for elem in boards.values()), 'boards from', len(files), 'files', file=sys.stderr)
+
+store = probcut_stats.ProbcutStore(args.version)
+sampler = Sampler(store, 'sampler_' + args.mode, buckets(args.mode, args.max_depth), boards)
+
+cmd = [args.engine, '-quiet', '-showvalue', '-nobook', '-noautopass', '-t', '1', '-hash', str(args.hash_level)]
+if args.eval_file:
+    cmd += ['-eval', args.eval_file]
+engines = [Engine(cmd) for _ in range(args.jobs)]
+errors = []
+
+def work(engine, seed):
+    try:
+        sampler.work(engine, np.random.default_rng(seed))
+    except Exception as e:
+        errors.append(e)
+
+threads = [threading.Thread(target=work, args=(engine, rng.integers(1 << 62)), daemon=True) for engine in engines]
+try:
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(0.5)
+except KeyboardInterrupt:
+    print('interrupted', file=sys.stderr)
+finally:
+    with sampler.lock:
+        sampler.save()
+    for engine in engines:
+        engine.close()
+for e in errors:
+    print('worker failed:', e, file=sys.stderr)
@@ -0,0 +1,182 @@
+"""Per-cell statistics of probcut error samples.
+
+The sample files (see README.md) are parsed into columns with np.loadtxt and
+reduced with np.bincount to count, sum and sum of squares per
+(n_discs, depth1, depth2) cell, so model_sigma*.py never hold the samples
+themselves. Endgame samples have depth2 = 64 - n_discs.
+
+ProbcutStore keeps these sums per eval version in data/<version>/probcut_stats.npz
+and merges only what was appended to the sample files since the last run.
+
+    store = ProbcutStore('20250918_7_8_20250917_1')
+    store.merge(data_files)
+    store.merge(data_files_end, end=True)
+    store.save()
+    stats = store.stats(data_files)
+"""
+import hashlib
+import io
+import os
+import numpy as np
+
+N_DISCS = 65
+N_DEPTH = 61
+SHAPE = (N_DISCS, N_DEPTH, N_DEPTH) # n_discs, depth1 (short), depth2 (long)
+FINGERPRINT_BYTES = 1 << 16
+
+def parse_samples(raw, end=False):
+    """(n_discs, depth1, depth2, error) of the complete lines of sample file bytes,
+    and the number of bytes they span. A last line without newline (a generator
+    still writing) is left for later. End files have depth2 = 64 - n_discs."""
+    raw = raw[:raw.rfind(b'\n') + 1]
+    if not raw.strip():
+        return tuple(np.zeros(0, dtype=np.int64) for _ in range(4)), len(raw)
+    cols = np.loadtxt(io.StringIO(raw.decode()), dtype=np.int64, ndmin=2).T
+    if end:
+        n_discs, depth1, error = cols
+        return (n_discs, depth1, 64 - n_discs, error), len(raw)
+    return tuple(cols), len(raw)
+
+def aggregate(n_discs, depth1, depth2, error):
+    """count, sum and sum of squares of the errors per cell, each of SHAPE."""
+    key = np.ravel_multi_index((n_discs, depth1, depth2), SHAPE)
+    size = N_DISCS * N_DEPTH * N_DEPTH
+    error = error.astype(np.float64)
+    count = np.bincount(key, minlength=size).reshape(SHAPE)
+    total = np.bincount(key, weights=error, minlength=size).reshape(SHAPE)
+    sumsq = np.bincount(key, weights=error * error, minlength=size).reshape(SHAPE)
+    return count, total, sumsq
+
+def cells(stats, min_count=3):
+    """Cells with at least min_count samples as columns
+    (n_discs, depth1, depth2, n_data, mean, rms); rms is the sd around 0."""
+    count, total, sumsq = stats
+    n_discs, depth1, depth2 = np.nonzero(count >= min_count)
+    n = count[n_discs, depth1, depth2]
+    mean = total[n_discs, depth1, depth2] / n
+    rms = np.sqrt(sumsq[n_discs, depth1, depth2] / n)
+    return n_discs, depth1, depth2, n, mean, rms
+
+def sparse_add(cells, key, count, total, sumsq):
+    """Merges per-cell sums given as (key, count, sum, sumsq) into cells of the same form."""
+    key = np.concatenate((cells[0], key))
+    uniq, inverse = np.unique(key, return_inverse=True)
+    return (uniq,) + tuple(np.bincount(inverse, weights=np.concatenate((a, b)), minlength=len(uniq)) for a, b in zip(cells[1:], (count, total, sumsq)))
+
+EMPTY_CELLS = (np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0), np.zeros(0))
+
+class ProbcutStore:
+    """Sufficient statistics (count, sum, sum of squares per cell) of every sample
+    source of one eval version, kept in data/<version>/probcut_stats.npz.
+
+    Sources are sample files, read incrementally from the byte offset reached last
+    time, so files that a generator keeps appending to cost only their new lines,
+    or named streams fed with add(). A hash of the start and the end of the merged
+    part of each file is kept too: a file that was regenerated or replaced, even
+    by a longer one, no longer matches it and is merged again from scratch.
+    Cells are stored sparsely per source so any subset of sources can be summed.
+    """
+
+    def __init__(self, version, data_dir='data'):
+        self.dir = os.path.join(data_dir, version)
+        self.file = os.path.join(self.dir, 'probcut_stats.npz')
+        self.offsets = {}      # source -> bytes already merged (-1 for streams)
+        self.digests = {}      # source -> digest() of the merged bytes, for files
+        self.cells = {}        # source -> (key, count, sum, sumsq)
+        try:
+            with np.load(self.file) as store:
+                names = store['names'].tolist()
+                for i, name in enumerate(names):
+                    self.offsets[name] = int(store['offsets'][i])
+                    if 'digests' in store: # stores written before digests are read again once
+                        self.digests[name] = str(store['digests'][i])
+                    mask = store['source'] == i
+                    self.cells[name] = tuple(store[elem][mask] for elem in ('key', 'count', 'sum', 'sumsq'))
+        except FileNotFoundError:
+            pass
+
+    def source_name(self, file):
+        return os.path.relpath(file, self.dir).replace(os.sep, '/')
+
+    def add(self, source, n_discs, depth1, depth2, error):
+        """Merges samples (arrays, or scalars of a single sample) into a stream source."""
+        n_discs, depth1, depth2, error = (np.atleast_1d(np.asarray(elem, dtype=np.int64)) for elem in (n_discs, depth1, depth2, error))
+        count, total, sumsq = aggregate(n_discs, depth1, depth2, error)
+        key = np.flatnonzero(count)
+        self.cells[source] = sparse_add(self.cells.get(source, EMPTY_CELLS), key, count.ravel()[key], total.ravel()[key], sumsq.ravel()[key])
+        self.offsets.setdefault(source, -1)
+
+    @staticmethod
+    def digest(f, offset):
+        """Hash of the first and the last FINGERPRINT_BYTES of the first offset bytes."""
+        h = hashlib.sha1()
+        f.seek(0)
+        h.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        h.update(f.read(min(offset, FINGERPRINT_BYTES)))
+        return h.hexdigest()
+
+    def merge_file(self, file, end=False):
+        """Merges the lines of a sample file added since the last merge. A file that
+        shrank or whose merged part changed (e.g. regenerated by get_data_probcut_*)
+        is read again from the start. Returns the number of new samples."""
+        name = self.source_name(file)
+        offset = self.offsets.get(name, 0)
+        try:
+            size = os.path.getsize(file)
+        except FileNotFoundError:
+            print('cannot open', file)
+            return 0
+        with open(file, 'rb') as f:
+            if offset and (size < offset or self.digests.get(name) != self.digest(f, offset)):
+                print(file, 'changed, merging it again')
+                offset = 0
+                self.cells.pop(name, None)
+            f.seek(offset)
+            cols, n_bytes = parse_samples(f.read(), end)
+            self.offsets[name] = offset + n_bytes
+            self.digests[name] = self.digest(f, offset + n_bytes)
+        self.cells.setdefault(name, EMPTY_CELLS)
+        if len(cols[0]) == 0:
+            return 0
+        count, total, sumsq = aggregate(*cols)
+        key = np.flatnonzero(count)
+        self.cells[name] = sparse_add(self.cells[name], key, count.ravel()[key], total.ravel()[key], sumsq.ravel()[key])
+        return len(cols[0])
+
+    def merge(self, files, end=False):
+        return sum(self.merge_file(file, end) for file in files)
+
+    def merge_dir(self):
+        """Merges every probcut_mid*.txt and probcut_end*.txt of the version directory."""
+        names = sorted(os.listdir(self.dir)) if os.path.isdir(self.dir) else []
+        n = self.merge(os.path.join(self.dir, elem) for elem in names if elem.startswith('probcut_mid') and elem.endswith('.txt'))
+        n += self.merge((os.path.join(self.dir, elem) for elem in names if elem.startswith('probcut_end') and elem.endswith('.txt')), end=True)
+        return n
+
+    def stats(self, sources=None):
+        """Dense (count, sum, sumsq) of the given sources (files or stream names; all if None)."""
+        if sources is None:
+            names = list(self.cells)
+        else:
+            names = [elem if elem in self.cells else self.source_name(elem) for elem in sources]
+        size = N_DISCS * N_DEPTH * N_DEPTH
+        res = [np.zeros(size) for _ in range(3)]
+        for name in names:
+            if name not in self.cells:
+                continue
+            key = self.cells[name][0]
+            for arr, values in zip(res, self.cells[name][1:]):
+                arr[key] += values
+        return res[0].astype(np.int64).reshape(SHAPE), res[1].reshape(SHAPE), res[2].reshape(SHAPE)
+
+    def save(self):
+        names = list(self.cells)
+        os.makedirs(self.dir, exist_ok=True)
+        tmp_file = self.file + '.tmp.npz'
+        np.savez_compressed(tmp_file,
+            names=np.array(names, dtype=str), offsets=np.array([self.offsets[name] for name in names], dtype=np.int64),
+            digests=np.array([self.digests.get(name, '') for name in names], dtype=str),
+            source=np.concatenate([np.full(len(self.cells[name][0]), i, dtype=np.int32) for i, name in enumerate(names)] + [np.zeros(0, dtype=np.int32)]),
+            **{elem: np.concatenate([self.cells[name][j] for name in names] + [EMPTY_CELLS[j]]) for j, elem in enumerate(('key', 'count', 'sum', 'sumsq'))})
+        os.replace(tmp_file, self.file)
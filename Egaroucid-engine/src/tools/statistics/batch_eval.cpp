@@ -0,0 +1,101 @@
+#include <iostream>
+#include <vector>
+#include <cstdio>
+#include <cstdlib>
+#include <string>
+#ifdef _WIN32
+    #include <fcntl.h>
+    #include <io.h>
+#endif
+#include "./../../engine/ai.hpp"
+
+/*
+    Batch evaluation server for batch_eval.py
+
+    stdin / stdout are binary, native byte order. A request is
+        int32 n_boards, int32 depth, then n_boards times (uint64 player, uint64 opponent)
+    and its response is n_boards int8 values for the side to move (player).
+    depth 0 is the evaluation function, otherwise a search of depth with MPC 100%
+    (exact when depth >= n_empties). A player without legal moves passes,
+    finished games get their final score. n_boards 0 ends the process.
+    Every search starts with an empty transposition table, so a value does not
+    depend on the other boards of its request nor on earlier requests.
+*/
+
+constexpr int THREAD_SIZE = 0;
+constexpr int BATCH_EVAL_HASH_LEVEL = 16; // small, as the table is cleared before every search
+
+int batch_eval_value(Board board, int depth) {
+    int sign = 1;
+    if (board.get_legal() == 0ULL) {
+        board.pass();
+        if (board.get_legal() == 0ULL) {
+            board.pass();
+            return board.score_player();
+        }
+        sign = -1;
+    }
+    if (depth == 0) {
+        return sign * mid_evaluate(&board);
+    }
+    bool searching = true;
+    Search_result result = tree_search_legal(board, -SCORE_MAX, SCORE_MAX, depth, MPC_100_LEVEL, false, board.get_legal(), false, TIME_LIMIT_INF, THREAD_ID_NONE, &searching);
+    return sign * result.value;
+}
+
+int main(int argc, char *argv[]){
+    std::string eval_file = "./../../../bin/resources/eval.egev2";
+    std::string mo_end_file = "./../../../bin/resources/eval_move_ordering_end.egev";
+    if (argc >= 2) {
+        eval_file = argv[1];
+    }
+    if (argc >= 3) {
+        mo_end_file = argv[2];
+    }
+#ifdef _WIN32
+    _setmode(_fileno(stdin), _O_BINARY);
+    _setmode(_fileno(stdout), _O_BINARY);
+#endif
+
+    thread_pool.resize(THREAD_SIZE);
+    bit_init();
+    mobility_init();
+    flip_init();
+    last_flip_init();
+    endsearch_init();
+    mpc_init();
+    move_ordering_init();
+    stability_init();
+    hash_resize(BATCH_EVAL_HASH_LEVEL, BATCH_EVAL_HASH_LEVEL, false);
+    if (!evaluate_init(eval_file, mo_end_file, false)) {
+        std::cerr << "can't open " << eval_file << std::endl;
+        return 1;
+    }
+
+    std::vector<uint64_t> boards;
+    std::vector<int8_t> values;
+    int32_t header[2];
+    while (fread(header, sizeof(int32_t), 2, stdin) == 2) {
+        int n_boards = header[0];
+        int depth = header[1];
+        if (n_boards <= 0) {
+            break;
+        }
+        boards.resize(n_boards * 2);
+        values.resize(n_boards);
+        if (fread(boards.data(), sizeof(uint64_t), n_boards * 2, stdin) != (size_t)n_boards * 2) {
+            std::cerr << "request broken" << std::endl;
+            return 1;
+        }
+        for (int i = 0; i < n_boards; ++i) {
+            Board board(boards[i * 2], boards[i * 2 + 1]);
+            if (depth > 0) {
+                transposition_table.init(); // bounds of other boards would change the search
+            }
+            values[i] = (int8_t)batch_eval_value(board, depth);
+        }
+        fwrite(values.data(), sizeof(int8_t), n_boards, stdout);
+        fflush(stdout);
+    }
+    return 0;
+}
@@ -0,0 +1,100 @@
+"""Evaluation of many boards at once with batch_eval.cpp.
+
+BatchEvaluator keeps n_jobs batch_eval processes and sends them bitboards in
+binary requests of batch_size boards (see batch_eval.cpp for the framing), so a
+pipe round trip is paid per few thousand boards instead of per board.
+
+    with BatchEvaluator(n_jobs=8) as evaluator:
+        player, opponent = text_to_bitboards(lines)
+        values = evaluator.evaluate(player, opponent, depth)   # int8, side to move
+
+The records*/ text boards are 64 chars of p (side to move), o and . followed by
+anything; text_to_bitboards reads them with NumPy (a1 = bit 63).
+"""
+import os
+import queue
+import subprocess
+import threading
+import numpy as np
+
+DEFAULT_EXE = 'batch_eval.out'
+# defaults of batch_eval.cpp, relative to the working directory
+DEFAULT_EVAL_FILE = './../../../bin/resources/eval.egev2'
+DEFAULT_MO_END_FILE = './../../../bin/resources/eval_move_ordering_end.egev'
+BATCH_SIZE = 4096
+
+def text_to_bitboards(lines):
+    """(player, opponent) uint64 arrays of the first 64 chars of every line."""
+    if not lines:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64)
+    cells = np.frombuffer(''.join(line[:64] for line in lines).encode(), dtype=np.uint8).reshape(-1, 64)
+    player = np.packbits(cells == ord('p'), axis=1).view('>u8').ravel().astype(np.uint64)
+    opponent = np.packbits(cells == ord('o'), axis=1).view('>u8').ravel().astype(np.uint64)
+    return player, opponent
+
+def read_lines(file):
+    with open(file, 'r') as f:
+        return f.read().splitlines()
+
+class BatchEvaluator:
+    def __init__(self, n_jobs=None, exe=DEFAULT_EXE, eval_file=None, mo_end_file=None, batch_size=BATCH_SIZE):
+        cmd = [exe, eval_file or DEFAULT_EVAL_FILE, mo_end_file or DEFAULT_MO_END_FILE]
+        self.batch_size = batch_size
+        self.procs = [subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE) for _ in range(n_jobs or os.cpu_count())]
+
+    def _request(self, proc, player, opponent, depth):
+        boards = np.empty((len(player), 2), dtype='=u8')
+        boards[:, 0] = player
+        boards[:, 1] = opponent
+        proc.stdin.write(np.array([len(player), depth], dtype='=i4').tobytes() + boards.tobytes())
+        proc.stdin.flush()
+        raw = proc.stdout.read(len(player))
+        if len(raw) < len(player):
+            raise RuntimeError('batch_eval terminated')
+        return np.frombuffer(raw, dtype=np.int8)
+
+    def evaluate(self, player, opponent, depth):
+        """Values (int8, for the side to move) of every board; depth 0 is the evaluation function."""
+        player = np.asarray(player, dtype=np.uint64)
+        opponent = np.asarray(opponent, dtype=np.uint64)
+        res = np.zeros(len(player), dtype=np.int8)
+        tasks = queue.Queue()
+        for start in range(0, len(player), self.batch_size):
+            tasks.put(start)
+        errors = []
+
+        def work(proc):
+            try:
+                while True:
+                    try:
+                        start = tasks.get_nowait()
+                    except queue.Empty:
+                        return
+                    end = start + self.batch_size
+                    res[start:end] = self._request(proc, player[start:end], opponent[start:end], depth)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(proc,)) for proc in self.procs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return res
+
+    def close(self):
+        for proc in self.procs:
+            try:
+                proc.stdin.write(np.zeros(2, dtype='=i4').tobytes())
+                proc.stdin.close()
+            except OSError:
+                pass
+            proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
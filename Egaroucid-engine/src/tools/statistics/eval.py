@@ -1,8 +1,13 @@
-import subprocess
 import glob
-from othello_py import *
-from copy import deepcopy
+import os
+import sys
+import argparse
+import numpy as np
 from tqdm import tqdm
+from batch_eval import BatchEvaluator, DEFAULT_EXE, text_to_bitboards, read_lines
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'util'))
+import othello_bitboard_np
 
 drs = [
     'data/records15/'
@@ -12,73 +17,46 @@ out_drs = [
     'data/records15_with_eval/'
 ]
 
-def score_to_string(score):
-    s = (score + 64) // 2
-    return chr(ord('!') + s)
-
 MAX_DEPTH = 6
+MIN_EMPTIES = 14
+N_LINES_PER_CHUNK = 1 << 16
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='batch_eval processes')
+parser.add_argument('--exe', type=str, default=DEFAULT_EXE)
+parser.add_argument('--eval_file', type=str, default=None)
+parser.add_argument('--mo_end_file', type=str, default=None, help='move ordering evaluation for the endgame search')
+args = parser.parse_args()
 
-egaroucid = subprocess.Popen(('Egaroucid6_test.exe').split(), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+def score_to_code(score):
+    return ord('!') + (score.astype(np.int64) + 64) // 2
 
-for dr, out_dr in zip(drs, out_drs):
-    files = glob.glob(dr + '*.txt')
-    for file in files:
-        with open(file, 'r') as f:
-            data = f.read().splitlines()
-        out_file = out_dr + file.split('\\')[-1]
-        print(out_file)
-        with open(out_file, 'w') as f:
-            for datum in tqdm(data):
-                if datum[:64].count('.') <= 13:
-                    continue
-                output_data = ''
-                o = othello()
-                o.player = black
-                idx = 0
-                for i in range(hw):
-                    for j in range(hw):
-                        o.grid[i][j] = black if datum[idx] == 'p' else white if datum[idx] == 'o' else vacant
-                        idx += 1
-                o.check_legal()
-                
-                for i in range(hw):
-                    for j in range(hw):
-                        if o.grid[i][j] == legal:
-                            oo = deepcopy(o)
-                            oo.move(i, j)
-                            input_datum = '1\n'
-                            for k in range(hw):
-                                for l in range(hw):
-                                    input_datum += '0' if oo.grid[k][l] == black else '1' if oo.grid[k][l] == white else '.'
-                                input_datum += '\n'
-                            output_data += chr(ord('!') + i * hw + j)
-                            egaroucid.stdin.write((input_datum + str(-1) + '\n').encode('utf-8'))
-                            egaroucid.stdin.flush()
-                            line = egaroucid.stdout.readline().decode()
-                            vals = [int(elem) for elem in line.split()]
-                            for elem in vals:
-                                output_data += chr(ord('!') + elem)
-                            for depth in range(MAX_DEPTH + 1):
-                                egaroucid.stdin.write((input_datum + str(depth) + '\n').encode('utf-8'))
-                                egaroucid.stdin.flush()
-                                line = egaroucid.stdout.readline().decode()
-                                val = int(line)
-                                output_data += score_to_string(val)
-                            output_data += ' '
-                '''
-                input_datum = '0\n'
-                for k in range(hw):
-                    for l in range(hw):
-                        input_datum += '0' if o.grid[k][l] == black else '1' if o.grid[k][l] == white else '.'
-                    input_datum += '\n'
-                for depth in range(MAX_DEPTH):
-                    egaroucid.stdin.write((str(depth) + '\n' + input_datum).encode('utf-8'))
-                    egaroucid.stdin.flush()
-                    line = egaroucid.stdout.readline().decode()
-                    val = int(line)
-                    output_data += score_to_string(val)
-                egaroucid.stdin.write('-1\n'.encode('utf-8'))
-                '''
-                f.write(datum + ' ' + output_data + '\n')
+def annotate(evaluator, data):
+    """For every legal move (cells in order): the cell, then the value of the child
+    for its side to move at depth 0..MAX_DEPTH, then a space."""
+    player, opponent = text_to_bitboards(data)
+    legal = othello_bitboard_np.calc_legal(player, opponent)
+    cell_bits = np.uint64(63) - np.arange(64, dtype=np.uint64)
+    board_idx, cell = np.nonzero((legal[:, np.newaxis] >> cell_bits) & np.uint64(1))
+    child_player, child_opponent = othello_bitboard_np.move(player[board_idx], opponent[board_idx], cell_bits[cell])
+    codes = np.empty((len(cell), MAX_DEPTH + 3), dtype=np.uint8)
+    codes[:, 0] = ord('!') + cell
+    for depth in range(MAX_DEPTH + 1):
+        codes[:, 1 + depth] = score_to_code(evaluator.evaluate(child_player, child_opponent, depth))
+    codes[:, -1] = ord(' ')
+    ends = np.cumsum(np.bincount(board_idx, minlength=len(data))) * codes.shape[1]
+    text = codes.tobytes().decode()
+    return [datum + ' ' + text[end - length:end] for datum, end, length in zip(data, ends, np.diff(ends, prepend=0))]
 
-egaroucid.kill()
\ No newline at end of file
+with BatchEvaluator(args.jobs, args.exe, args.eval_file, args.mo_end_file) as evaluator:
+    for dr, out_dr in zip(drs, out_drs):
+        os.makedirs(out_dr, exist_ok=True)
+        files = glob.glob(dr + '*.txt')
+        for file in files:
+            data = [datum for datum in read_lines(file) if datum[:64].count('.') >= MIN_EMPTIES]
+            out_file = out_dr + os.path.basename(file)
+            print(out_file)
+            with open(out_file, 'w') as f:
+                for start in tqdm(range(0, len(data), N_LINES_PER_CHUNK)):
+                    for line in annotate(evaluator, data[start:start + N_LINES_PER_CHUNK]):
+                        f.write(line + '\n')
@@ -1,8 +1,8 @@
-import subprocess
 import glob
-from othello_py import *
-from copy import deepcopy
+import os
+import argparse
 from tqdm import tqdm
+from batch_eval import BatchEvaluator, DEFAULT_EXE, text_to_bitboards, read_lines
 
 drs = [
     'data/records16/'
@@ -13,58 +13,27 @@ out_drs = [
 ]
 
 DEPTH = 5
+N_LINES_PER_CHUNK = 1 << 16
 
-egaroucid = subprocess.Popen(('Egaroucid6_test.exe').split(), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+parser = argparse.ArgumentParser()
+parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='batch_eval processes')
+parser.add_argument('--exe', type=str, default=DEFAULT_EXE)
+parser.add_argument('--eval_file', type=str, default=None)
+parser.add_argument('--mo_end_file', type=str, default=None, help='move ordering evaluation for the endgame search')
+args = parser.parse_args()
 
-for dr, out_dr in zip(drs, out_drs):
-    files = glob.glob(dr + '*.txt')
-    for file in files:
-        with open(file, 'r') as f:
-            data = f.read().splitlines()
-        out_file = out_dr + file.split('\\')[-1]
-        print(out_file)
-        with open(out_file, 'w') as f:
-            for datum in tqdm(data):
-                output_data = ''
-                o = othello()
-                o.player = black
-                idx = 0
-                for i in range(hw):
-                    for j in range(hw):
-                        o.grid[i][j] = black if datum[idx] == 'p' else white if datum[idx] == 'o' else vacant
-                        idx += 1
-                o.check_legal()
-                '''
-                for i in range(hw):
-                    for j in range(hw):
-                        if o.grid[i][j] == legal:
-                            oo = deepcopy(o)
-                            oo.move(i, j)
-                            input_datum = '1\n'
-                            for k in range(hw):
-                                for l in range(hw):
-                                    input_datum += '0' if oo.grid[k][l] == black else '1' if oo.grid[k][l] == white else '.'
-                                input_datum += '\n'
-                            output_data += chr(ord('!') + i * hw + j)
-                            for depth in range(MAX_DEPTH):
-                                egaroucid.stdin.write((input_datum + str(depth) + '\n').encode('utf-8'))
-                                egaroucid.stdin.flush()
-                                line = egaroucid.stdout.readline().decode()
-                                val = int(line)
-                                output_data += score_to_string(val)
-                            output_data += ' '
-                '''
-                input_datum = '0\n'
-                for k in range(hw):
-                    for l in range(hw):
-                        input_datum += '0' if o.grid[k][l] == black else '1' if o.grid[k][l] == white else '.'
-                    input_datum += '\n'
-                egaroucid.stdin.write((str(DEPTH) + '\n' + input_datum).encode('utf-8'))
-                egaroucid.stdin.flush()
-                line = egaroucid.stdout.readline().decode()
-                val = int(line)
-                output_data += " " + str(val)
-                #egaroucid.stdin.write('-1\n'.encode('utf-8'))
-                f.write(datum + ' ' + output_data + '\n')
-
-egaroucid.kill()
\ No newline at end of file
+with BatchEvaluator(args.jobs, args.exe, args.eval_file, args.mo_end_file) as evaluator:
+    for dr, out_dr in zip(drs, out_drs):
+        os.makedirs(out_dr, exist_ok=True)
+        files = glob.glob(dr + '*.txt')
+        for file in files:
+            data = read_lines(file)
+            out_file = out_dr + os.path.basename(file)
+            print(out_file)
+            with open(out_file, 'w') as f:
+                for start in tqdm(range(0, len(data), N_LINES_PER_CHUNK)):
+                    chunk = data[start:start + N_LINES_PER_CHUNK]
+                    player, opponent = text_to_bitboards(chunk)
+                    values = evaluator.evaluate(player, opponent, DEPTH)
+                    for datum, val in zip(chunk, values.tolist()):
+                        f.write(datum + '  ' + str(val) + '\n')
@@ -0,0 +1,188 @@
+"""Bitboard Othello board shared by the Python tools.
+
+The board is held as two 64-bit ints, one per colour, in Egaroucid's numbering
+(a1 = bit 63, h8 = bit 0, so grid[y][x] is bit 63 - (y * 8 + x)). Legal moves and
+flips are computed with the same shift-and-mask code as engine/mobility_generic.hpp
+and engine/flip_generic.hpp instead of walking squares one by one.
+
+`othello` keeps the interface of the old list-of-lists class (grid, player,
+n_stones, check_legal, move, move_stdin, print_info), so `from othello_py import *`
+scripts run unchanged.
+"""
+
+hw = 8
+hw2 = 64
+dy = [0, 1, 0, -1, 1, 1, -1, -1]
+dx = [1, 0, -1, 0, 1, -1, 1, -1]
+black = 0
+white = 1
+legal = 2
+vacant = 3
+
+MASK = 0xFFFFFFFFFFFFFFFF
+
+def inside(y, x):
+    return 0 <= y < hw and 0 <= x < hw
+
+def cell_bit(y, x):
+    return 1 << (hw2 - 1 - (y * hw + x))
+
+def calc_legal(p, o):
+    """All legal moves of `p` against `o` as a bitboard (see calc_legal in mobility_generic.hpp)."""
+    mo = o & 0x7E7E7E7E7E7E7E7E
+    f1 = mo & (p << 1);        f7 = mo & (p << 7);        f9 = mo & (p << 9);        f8 = o & (p << 8)
+    f1 |= mo & (f1 << 1);      f7 |= mo & (f7 << 7);      f9 |= mo & (f9 << 9);      f8 |= o & (f8 << 8)
+    pre1 = mo & (mo << 1);     pre7 = mo & (mo << 7);     pre9 = mo & (mo << 9);     pre8 = o & (o << 8)
+    f1 |= pre1 & (f1 << 2);    f7 |= pre7 & (f7 << 14);   f9 |= pre9 & (f9 << 18);   f8 |= pre8 & (f8 << 16)
+    f1 |= pre1 & (f1 << 2);    f7 |= pre7 & (f7 << 14);   f9 |= pre9 & (f9 << 18);   f8 |= pre8 & (f8 << 16)
+    moves = (f1 << 1) | (f7 << 7) | (f9 << 9) | (f8 << 8)
+    f1 = mo & (p >> 1);        f7 = mo & (p >> 7);        f9 = mo & (p >> 9);        f8 = o & (p >> 8)
+    f1 |= mo & (f1 >> 1);      f7 |= mo & (f7 >> 7);      f9 |= mo & (f9 >> 9);      f8 |= o & (f8 >> 8)
+    pre1 >>= 1;                pre7 >>= 7;                pre9 >>= 9;                pre8 >>= 8
+    f1 |= pre1 & (f1 >> 2);    f7 |= pre7 & (f7 >> 14);   f9 |= pre9 & (f9 >> 18);   f8 |= pre8 & (f8 >> 16)
+    f1 |= pre1 & (f1 >> 2);    f7 |= pre7 & (f7 >> 14);   f9 |= pre9 & (f9 >> 18);   f8 |= pre8 & (f8 >> 16)
+    moves |= (f1 >> 1) | (f7 >> 7) | (f9 >> 9) | (f8 >> 8)
+    return moves & ~(p | o) & MASK
+
+def calc_flip(p, o, pos):
+    """Discs flipped when `p` plays on bit `pos` (same result as Flip::calc_flip)."""
+    x = 1 << pos
+    mo = o & 0x7E7E7E7E7E7E7E7E
+    flipped = 0
+    for d, m in ((1, mo), (7, mo), (9, mo), (8, o)):
+        f = m & (x << d)
+        f |= m & (f << d); f |= m & (f << d); f |= m & (f << d)
+        f |= m & (f << d); f |= m & (f << d)
+        if p & (f << d):
+            flipped |= f
+        f = m & (x >> d)
+        f |= m & (f >> d); f |= m & (f >> d); f |= m & (f >> d)
+        f |= m & (f >> d); f |= m & (f >> d)
+        if p & (f >> d):
+            flipped |= f
+    return flipped
+
+def pop_count(x):
+    return bin(x).count('1')
+
+class _grid_row:
+    def __init__(self, board, y):
+        self.board = board
+        self.y = y
+
+    def __getitem__(self, x):
+        return self.board.get_cell(self.y, x)
+
+    def __setitem__(self, x, v):
+        self.board.set_cell(self.y, x, v)
+
+    def __len__(self):
+        return hw
+
+    def __iter__(self):
+        return (self.board.get_cell(self.y, x) for x in range(hw))
+
+class _grid:
+    def __init__(self, board):
+        self.board = board
+
+    def __getitem__(self, y):
+        if not 0 <= y < hw:
+            raise IndexError(y)
+        return _grid_row(self.board, y)
+
+    def __len__(self):
+        return hw
+
+    def __iter__(self):
+        return (_grid_row(self.board, y) for y in range(hw))
+
+class othello:
+
+    def __init__(self):
+        # bb[black], bb[white]; legal_bb is what the last check_legal() marked
+        self.bb = [cell_bit(3, 4) | cell_bit(4, 3), cell_bit(3, 3) | cell_bit(4, 4)]
+        self.legal_bb = 0
+        self.player = black
+
+    @property
+    def grid(self):
+        return _grid(self)
+
+    @property
+    def n_stones(self):
+        return [pop_count(self.bb[black]), pop_count(self.bb[white])]
+
+    def get_cell(self, y, x):
+        bit = cell_bit(y, x)
+        if self.bb[black] & bit:
+            return black
+        if self.bb[white] & bit:
+            return white
+        if self.legal_bb & bit:
+            return legal
+        return vacant
+
+    def set_cell(self, y, x, v):
+        bit = cell_bit(y, x)
+        self.bb[black] &= ~bit
+        self.bb[white] &= ~bit
+        self.legal_bb &= ~bit
+        if v == black or v == white:
+            self.bb[v] |= bit
+        elif v == legal:
+            self.legal_bb |= bit
+
+    def check_legal(self):
+        self.legal_bb = calc_legal(self.bb[self.player], self.bb[1 - self.player])
+        return self.legal_bb != 0
+
+    def move(self, y, x):
+        if not inside(y, x):
+            print('out of range')
+            return False
+        bit = cell_bit(y, x)
+        if not self.legal_bb & bit:
+            print('illegal move')
+            return False
+        flipped = calc_flip(self.bb[self.player], self.bb[1 - self.player], hw2 - 1 - (y * hw + x))
+        self.bb[self.player] ^= flipped | bit
+        self.bb[1 - self.player] ^= flipped
+        self.legal_bb &= ~bit
+        self.player = 1 - self.player
+        return True
+
+    def move_stdin(self):
+        coord = input(('黒' if self.player == black else '白') + ' 着手: ')
+        try:
+            y = int(coord[1]) - 1
+            x = ord(coord[0]) - ord('A')
+            if not inside(y, x):
+                x = ord(coord[0]) - ord('a')
+                if not inside(y, x):
+                    print('please input like A1 or f5')
+                    self.move_stdin()
+                    return
+            if not self.move(y, x):
+                self.move_stdin()
+        except:
+            print('please input like A1 or f5')
+            self.move_stdin()
+
+    def print_info(self):
+        print('  A B C D E F G H')
+        for y in range(hw):
+            print(y + 1, end=' ')
+            for x in range(hw):
+                cell = self.get_cell(y, x)
+                if cell == black:
+                    print('X', end=' ')
+                elif cell == white:
+                    print('O', end=' ')
+                elif cell == legal:
+                    print('*', end=' ')
+                else:
+                    print('.', end=' ')
+            print('')
+        n_stones = self.n_stones
+        print('Black X ', n_stones[0], '-', n_stones[1], ' O White')
@@ -0,0 +1,62 @@
+"""Parity of othello_bitboard_np with the scalar othello_bitboard functions.
+
+    python othello_bitboard_np_test.py    (or pytest)
+"""
+import random
+import numpy as np
+import othello_bitboard
+import othello_bitboard_np
+
+def random_boards(n_games=30, seed=0):
+    """(player, opponent) of every position of n_games random games."""
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(n_games):
+        p, o = 0x0000000810000000, 0x0000001008000000
+        while True:
+            legal = othello_bitboard.calc_legal(p, o)
+            if legal == 0:
+                p, o = o, p
+                if othello_bitboard.calc_legal(p, o) == 0:
+                    break
+                continue
+            boards.append((p, o))
+            pos = rng.choice([i for i in range(64) if legal >> i & 1])
+            flip = othello_bitboard.calc_flip(p, o, pos)
+            p, o = o ^ flip, p ^ flip ^ (1 << pos)
+    return boards
+
+def test_calc_legal():
+    boards = random_boards()
+    p = np.array([b[0] for b in boards], dtype=np.uint64)
+    o = np.array([b[1] for b in boards], dtype=np.uint64)
+    legal = othello_bitboard_np.calc_legal(p, o)
+    assert [int(x) for x in legal] == [othello_bitboard.calc_legal(bp, bo) for bp, bo in boards]
+
+def test_move_every_square():
+    boards = random_boards()
+    p = np.array([b[0] for b in boards], dtype=np.uint64)
+    o = np.array([b[1] for b in boards], dtype=np.uint64)
+    for pos in range(64):
+        next_p, next_o = othello_bitboard_np.move(p, o, pos)
+        for i, (bp, bo) in enumerate(boards):
+            if othello_bitboard.calc_legal(bp, bo) >> pos & 1:
+                flip = othello_bitboard.calc_flip(bp, bo, pos)
+                expected = (bo ^ flip, bp ^ flip ^ (1 << pos))
+            else:
+                # occupied or flipping nothing: the board is left as it is
+                expected = (bp, bo)
+            assert (int(next_p[i]), int(next_o[i])) == expected, (bp, bo, pos)
+
+def test_occupied_square():
+    p, o = othello_bitboard_np.start_boards(1)
+    for pos in (27, 28, 35, 36):  # the four initial discs
+        assert int(othello_bitboard_np.calc_flip(p, o, pos)[0]) == 0
+        next_p, next_o = othello_bitboard_np.move(p, o, pos)
+        assert (next_p[0], next_o[0]) == (p[0], o[0])
+
+if __name__ == '__main__':
+    test_calc_legal()
+    test_move_every_square()
+    test_occupied_square()
+    print('ok')
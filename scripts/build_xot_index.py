@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Build a compact, deduplicated index of XOT start positions for match.py.
+
+Every line of the XOT file is played out to validate it, the resulting position is
+canonicalised under the 8 board symmetries, and transpositions (different lines, or
+mirrored lines, reaching the same position) are dropped. Each kept position is stored
+in an orientation its line can be replayed in, for engines without `setboard`.
+
+Index layout (little endian):
+    header  "<4sHHI"  magic b"XOTI", version, moves per record, record count
+    record  "<QQ"     player, opponent bitboards (side to move first; a1 = bit 63,
+                      h8 = bit 0, like Egaroucid's Board)
+            + moves per record bytes: the line in the canonical orientation as square
+              indices in the same numbering, padded with 0xFF
+The side to move is black when the line has an even number of moves.
+"""
+import argparse
+import struct
+import sys
+
+MAGIC = b"XOTI"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+BOARDS = struct.Struct("<QQ")
+NO_MOVE = 0xFF
+MASK = 0xFFFFFFFFFFFFFFFF
+
+# (shift, mask of squares that may move that way); positive shifts go left
+DIRECTIONS = (
+    (1, 0xFEFEFEFEFEFEFEFE), (-1, 0x7F7F7F7F7F7F7F7F),
+    (8, MASK), (-8, MASK),
+    (9, 0xFEFEFEFEFEFEFEFE), (-9, 0x7F7F7F7F7F7F7F7F),
+    (7, 0x7F7F7F7F7F7F7F7F), (-7, 0xFEFEFEFEFEFEFEFE),
+)
+
+def shift(b: int, d: int, mask: int) -> int:
+    b = (b << d) if d > 0 else (b >> -d)
+    return b & mask & MASK
+
+def coord_to_square(coord: str) -> int:
+    x = ord(coord[0].lower()) - ord("a")
+    y = int(coord[1]) - 1
+    return 63 - (y * 8 + x)
+
+def square_to_coord(sq: int) -> str:
+    r = 63 - sq
+    return "abcdefgh"[r % 8] + str(r // 8 + 1)
+
+def flips(player: int, opponent: int, sq: int) -> int:
+    res = 0
+    move = 1 << sq
+    for d, mask in DIRECTIONS:
+        line = 0
+        b = shift(move, d, mask)
+        while b & opponent:
+            line |= b
+            b = shift(b, d, mask)
+        if b & player:
+            res |= line
+    return res
+
+def flip_vertical(b: int) -> int:
+    return int.from_bytes(b.to_bytes(8, "little"), "big")
+
+def mirror_horizontal(b: int) -> int:
+    b = ((b >> 1) & 0x5555555555555555) | ((b & 0x5555555555555555) << 1)
+    b = ((b >> 2) & 0x3333333333333333) | ((b & 0x3333333333333333) << 2)
+    b = ((b >> 4) & 0x0F0F0F0F0F0F0F0F) | ((b & 0x0F0F0F0F0F0F0F0F) << 4)
+    return b
+
+def transpose(b: int) -> int:
+    t = (b ^ (b >> 7)) & 0x00AA00AA00AA00AA
+    b = b ^ t ^ (t << 7)
+    t = (b ^ (b >> 14)) & 0x0000CCCC0000CCCC
+    b = b ^ t ^ (t << 14)
+    t = (b ^ (b >> 28)) & 0x00000000F0F0F0F0
+    return b ^ t ^ (t << 28)
+
+def symmetries(b: int):
+    """The 8 images of `b` under the dihedral group, always in the same order."""
+    res = []
+    for t in (b, transpose(b)):
+        v = flip_vertical(t)
+        res += [t, v, mirror_horizontal(t), mirror_horizontal(v)]
+    return res
+
+def play_line(line: str):
+    """Play an XOT line from the initial position; returns (player, opponent, squares)."""
+    player = (1 << coord_to_square("e4")) | (1 << coord_to_square("d5"))  # black
+    opponent = (1 << coord_to_square("d4")) | (1 << coord_to_square("e5"))
+    squares = []
+    for i in range(0, len(line), 2):
+        sq = coord_to_square(line[i:i + 2])
+        f = flips(player, opponent, sq)
+        if (player | opponent) >> sq & 1 or not f:
+            raise ValueError(f"illegal move {line[i:i + 2]}")
+        player, opponent = opponent ^ f, player | f | (1 << sq)
+        squares.append(sq)
+    return player, opponent, squares
+
+# Symmetries that map the initial position onto itself (identity, rotation by 180
+# degrees and the two diagonal flips). The other four swap the colours of the centre,
+# so a line transformed by them could not be replayed from the standard start.
+START_PRESERVING = (0, 3, 4, 7)
+
+def canonical(player: int, opponent: int, squares):
+    """Returns the dedup key (smallest image under all 8 symmetries) and the position
+    and line in the smallest orientation that can still be replayed move by move."""
+    images = list(zip(symmetries(player), symmetries(opponent)))
+    key = min(images)
+    k = min(START_PRESERVING, key=lambda i: images[i])
+    moves = [symmetries(1 << sq)[k].bit_length() - 1 for sq in squares]
+    return key, images[k], moves
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--xot_file", type=str, default="XOT opening.txt")
+    ap.add_argument("--out", type=str, default="xot_index.bin")
+    args = ap.parse_args()
+
+    with open(args.xot_file, "r", encoding="utf-8", errors="ignore") as f:
+        lines = [ln.strip() for ln in f if ln.strip()]
+
+    positions = {}
+    n_illegal = 0
+    for n, line in enumerate(lines, 1):
+        try:
+            player, opponent, squares = play_line(line)
+        except (ValueError, IndexError) as e:
+            print(f"line {n}: {line}: {e}", file=sys.stderr)
+            n_illegal += 1
+            continue
+        key, position, moves = canonical(player, opponent, squares)
+        positions.setdefault(key, (position, moves))
+
+    moves_per_record = max((len(m) for _, m in positions.values()), default=0)
+    with open(args.out, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, moves_per_record, len(positions)))
+        for (player, opponent), moves in positions.values():
+            f.write(BOARDS.pack(player, opponent))
+            f.write(bytes(moves + [NO_MOVE] * (moves_per_record - len(moves))))
+    print(f"{len(lines)} lines, {n_illegal} illegal, {len(positions)} unique positions -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,55 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import collections
+import functools
+import json
+import math
 import os
 import random
-import subprocess
 import sys
 import re
-from dataclasses import dataclass
+import struct
+import time
+from dataclasses import asdict, dataclass, field
+
+import build_xot_index
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram: constant memory however many moves are added,
+    percentiles within ~1%."""
+    RATIO = 1.02
+
+    def __init__(self):
+        self.buckets = collections.Counter()
+        self.n = 0
+        self.total_ms = 0.0
+        self.nodes = 0
+        self.nodes_ms = 0.0
+
+    def add(self, ms: float, nodes=None):
+        self.n += 1
+        self.total_ms += ms
+        self.buckets[math.floor(math.log(max(ms, 1e-4)) / math.log(self.RATIO))] += 1
+        if nodes is not None:
+            self.nodes += nodes
+            self.nodes_ms += ms
+
+    def merge(self, other: "LatencyHistogram"):
+        self.buckets.update(other.buckets)
+        self.n += other.n
+        self.total_ms += other.total_ms
+        self.nodes += other.nodes
+        self.nodes_ms += other.nodes_ms
+        return self
+
+    def percentile(self, q: float) -> float:
+        acc = 0
+        for b in sorted(self.buckets):
+            acc += self.buckets[b]
+            if acc >= q * self.n:
+                return self.RATIO ** (b + 0.5)
+        return 0.0
 
 @dataclass
 class Stats:
@@ -20,10 +64,116 @@ class Stats:
     eg_as_white_w: int = 0
     eg_as_white_l: int = 0
     eg_as_white_d: int = 0
+    # Pentanomial counts of paired-opening results, indexed by the pair's score in
+    # half points: 0 = both games lost ... 4 = both games won.
+    pairs: list = field(default_factory=lambda: [0] * 5)
+    # genmove latency per (engine, colour, ply)
+    latency: dict = field(default_factory=dict)
+
+    def record(self, outcome: str, eg_diff: int, egar_is_black: bool):
+        self.games += 1
+        self.eg_disc_diff_sum += eg_diff
+
+        if egar_is_black:
+            if outcome == "W": self.eg_as_black_w += 1
+            elif outcome == "L": self.eg_as_black_l += 1
+            else: self.eg_as_black_d += 1
+        else:
+            if outcome == "W": self.eg_as_white_w += 1
+            elif outcome == "L": self.eg_as_white_l += 1
+            else: self.eg_as_white_d += 1
+
+        if outcome == "W":
+            self.eg_w += 1
+        elif outcome == "L":
+            self.eg_l += 1
+        else:
+            self.d += 1
+
+    def record_pair(self, outcome_a: str, outcome_b: str):
+        self.pairs[HALF_POINTS[outcome_a] + HALF_POINTS[outcome_b]] += 1
+
+    def record_latency(self, rec: "GameRecord", first_ply: int):
+        for i, (move, ms) in enumerate(zip(rec.moves, rec.latency_ms)):
+            if move == "pass":
+                continue
+            ply = first_ply + i
+            colour = "black" if ply % 2 == 0 else "white"
+            engine = "Egaroucid" if (colour == "black") == rec.egar_black else "Sensei"
+            nodes = rec.nodes[i] if i < len(rec.nodes) else None
+            self.latency.setdefault((engine, colour, ply), LatencyHistogram()).add(ms, nodes)
+
+    def latency_by(self, match) -> LatencyHistogram:
+        merged = LatencyHistogram()
+        for key, hist in self.latency.items():
+            if match(*key):
+                merged.merge(hist)
+        return merged
+
+HALF_POINTS = {"W": 2, "D": 1, "L": 0}
+
+@dataclass
+class GameRecord:
+    """One finished game, as appended to the --record file."""
+    game: int
+    opening: int  # index into the XOT file or --xot_index
+    egar_black: bool
+    outcome: str  # from Egaroucid's side: W/L/D
+    disc_diff: int  # (Egaroucid - Sensei)
+    moves: list  # moves after the opening, lower-case coordinates or "pass"
+    latency_ms: list  # genmove round-trip time of each move in `moves`
+    nodes: list = field(default_factory=list)  # node count the engine printed per move, or None
 
 def winrate(w, d, g):
     return (w + 0.5 * d) / g if g else 0.0
 
+def elo_to_score(elo: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+def score_to_elo(score: float) -> float:
+    score = min(max(score, 1e-6), 1.0 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+def elo_estimate(st: "Stats", paired: bool):
+    """Elo difference (Egaroucid - Sensei) and its 95% error bar.
+
+    Paired runs use the variance of the pentanomial pair scores, which removes the
+    opening's share of the noise; otherwise the per-game W/D/L variance is used.
+    """
+    if paired and sum(st.pairs):
+        counts = st.pairs
+        scores = [k / 4.0 for k in range(5)]
+    else:
+        counts = [st.eg_l, st.d, st.eg_w]
+        scores = [0.0, 0.5, 1.0]
+    n = sum(counts)
+    if n == 0:
+        return 0.0, 0.0
+    mean = sum(c * x for c, x in zip(counts, scores)) / n
+    var = sum(c * (x - mean) ** 2 for c, x in zip(counts, scores)) / n
+    margin = 1.96 * math.sqrt(var / n)
+    elo = score_to_elo(mean)
+    error = (score_to_elo(mean + margin) - score_to_elo(mean - margin)) / 2.0
+    return elo, error
+
+def sprt_bounds(alpha: float, beta: float):
+    return math.log(beta / (1.0 - alpha)), math.log((1.0 - beta) / alpha)
+
+def sprt_llr(pairs, elo0: float, elo1: float) -> float:
+    """Generalised SPRT log-likelihood ratio of H1 (elo1) vs H0 (elo0) for pentanomial
+    pair counts, using the normal approximation with the observed per-pair variance."""
+    n = sum(pairs)
+    if n == 0:
+        return 0.0
+    scores = [k / 4.0 for k in range(5)]
+    mean = sum(c * x for c, x in zip(pairs, scores)) / n
+    var = sum(c * (x - mean) ** 2 for c, x in zip(pairs, scores)) / n
+    if var <= 0.0:
+        return 0.0
+    s0 = elo_to_score(elo0)
+    s1 = elo_to_score(elo1)
+    return (s1 - s0) * (2.0 * mean - s0 - s1) / (2.0 * var / n)
+
 def parse_final_score(text: str) -> int:
     s = (text or "").strip()
     if s == "0":
@@ -41,67 +191,132 @@ def parse_final_score(text: str) -> int:
     return 0
 
 class GtpProc:
+    """GTP engine driven from an asyncio event loop.
+
+    Every command is sent with a numeric id and may be pipelined: `send` only waits for
+    its own response, which a single reader task matches by id. Egaroucid's board and
+    diagnostic output between responses is skipped, and stderr is drained by its own task
+    so a chatty engine can never block on a full pipe.
+    """
     def __init__(self, cmd, cwd=None, extra_env=None):
-        env = os.environ.copy()
+        self.cmd = cmd
+        self.cwd = cwd
+        self.env = os.environ.copy()
         if extra_env:
-            env.update(extra_env)
-        self.p = subprocess.Popen(
-            cmd,
-            cwd=cwd,
-            env=env,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
-        )
+            self.env.update(extra_env)
+        self.p = None
         self._id = 1
+        self._pending = {}
+        self._exit_error = None  # set once the engine's stdout is closed
+        self._stderr_tail = collections.deque(maxlen=20)
+        self._tasks = []
+        self.has_setboard = False
+        self._diagnostics = []
+        self.last_diagnostics = []  # non-GTP stdout lines printed before the last response
 
-    def send(self, command: str) -> str:
+    async def start(self):
+        self.p = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            cwd=self.cwd,
+            env=self.env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._tasks = [
+            asyncio.create_task(self._read_stdout()),
+            asyncio.create_task(self._drain_stderr()),
+        ]
+        resp = await self.send("known_command setboard")
+        self.has_setboard = not resp.startswith("?") and resp.split()[-1] == "true"
+        return self
+
+    async def send(self, command: str) -> str:
+        if self._exit_error is not None:
+            raise RuntimeError(self._exit_error)
         cid = self._id
         self._id += 1
-        self.p.stdin.write(f"{cid} {command}\n")
-        self.p.stdin.flush()
-        # Egaroucid console prints board/diagnostics to stdout. We ignore any lines until we see
-        # the GTP response marker ('=' or '?') for our command id, then read until the blank terminator.
-        started = False
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[cid] = fut
+        try:
+            self.p.stdin.write(f"{cid} {command}\n".encode())
+            await self.p.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the reader fails the pending future with the engine's stderr
+        # The reader may already have finished, in which case nothing would resolve `fut`.
+        if self._exit_error is not None and not fut.done():
+            self._pending.pop(cid, None)
+            raise RuntimeError(self._exit_error)
+        return await fut
+
+    def _response_id(self, line: str):
+        # Egaroucid answers "=<id> ...", the Sensei wrapper "= <id> ...". An engine that
+        # does not echo ids gets its responses matched to the oldest pending command.
+        rest = line[1:].lstrip()
+        head = rest.split(maxsplit=1)[0] if rest else ""
+        if head.isdigit():
+            return int(head)
+        return next(iter(self._pending), None)
+
+    async def _read_stdout(self):
+        cid = None
         resp_lines = []
-        while True:
-            line = self.p.stdout.readline()
-            if line == "":
-                err = ""
-                if self.p.stderr:
-                    try:
-                        err = self.p.stderr.read()
-                    except Exception:
-                        err = ""
-                raise RuntimeError(f"engine terminated. stderr={err[:500]}")
-            line = line.rstrip("\n")
-            if not started:
-                if not (line.startswith("=") or line.startswith("?")):
-                    continue
-                # If engine echoes id, require id match. Otherwise accept first marker line.
-                parts = line.split()
-                if len(parts) >= 2 and parts[1].isdigit():
-                    if int(parts[1]) != cid:
+        try:
+            while True:
+                raw = await self.p.stdout.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                if cid is None:
+                    if not (line.startswith("=") or line.startswith("?")):
+                        self._diagnostics.append(line)
                         continue
-                started = True
+                    rid = self._response_id(line)
+                    if rid not in self._pending:
+                        continue
+                    cid = rid
+                    resp_lines = [line]
+                    continue
+                if line == "":
+                    self.last_diagnostics, self._diagnostics = self._diagnostics, []
+                    fut = self._pending.pop(cid)
+                    if not fut.done():
+                        fut.set_result("\n".join(resp_lines))
+                    cid = None
+                    continue
                 resp_lines.append(line)
-                continue
-            # started
-            if line == "":
+        finally:
+            rc = await self.p.wait()
+            err = "\n".join(self._stderr_tail)
+            self._exit_error = f"engine terminated (rc={rc}). stderr={err[:500]}"
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(RuntimeError(self._exit_error))
+            self._pending.clear()
+
+    async def _drain_stderr(self):
+        while True:
+            raw = await self.p.stderr.readline()
+            if not raw:
                 break
-            resp_lines.append(line)
-        return "\n".join(resp_lines)
-    def quit(self):
+            self._stderr_tail.append(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+
+    async def quit(self):
+        if self.p is None:
+            return
         try:
-            self.send("quit")
+            await asyncio.wait_for(self.send("quit"), timeout=5)
         except Exception:
             pass
+        # Only signal an engine that ignored `quit`: terminating one that is already
+        # exiting races asyncio's child watcher for its exit status.
         try:
-            self.p.terminate()
-        except Exception:
-            pass
+            await asyncio.wait_for(self.p.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self.p.kill()
+            await self.p.wait()
+        for t in self._tasks:
+            t.cancel()
 
 def xot_to_opening_line(line: str):
     line = line.strip()
@@ -111,61 +326,178 @@ def xot_to_opening_line(line: str):
         moves.append(("b" if (j % 2 == 0) else "w", c))
     return moves
 
-def apply_opening(engine: GtpProc, opening_moves):
-    engine.send("clear_board")
-    for color, coord in opening_moves:
-        resp = engine.send(f"play {color} {coord}")
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+@functools.lru_cache(maxsize=None)
+def opening_board(xot_line: str) -> str:
+    """`setboard` argument for the position after an XOT line: 64 squares a1,b1,...,h8
+    as B/W/- followed by the side to move. Cached, so each opening is replayed once."""
+    cells = ["-"] * 64
+    cells[27] = cells[36] = "W"  # d4 e5
+    cells[28] = cells[35] = "B"  # e4 d5
+    side = "B"
+    for color, coord in xot_to_opening_line(xot_line):
+        me = color.upper()
+        opp = "W" if me == "B" else "B"
+        x = ord(coord[0].lower()) - ord("a")
+        y = int(coord[1]) - 1
+        flips = []
+        for dx, dy in DIRECTIONS:
+            line = []
+            cx, cy = x + dx, y + dy
+            while 0 <= cx < 8 and 0 <= cy < 8 and cells[cy * 8 + cx] == opp:
+                line.append(cy * 8 + cx)
+                cx += dx
+                cy += dy
+            if line and 0 <= cx < 8 and 0 <= cy < 8 and cells[cy * 8 + cx] == me:
+                flips += line
+        if cells[y * 8 + x] != "-" or not flips:
+            raise RuntimeError(f"illegal opening move {color} {coord} in {xot_line}")
+        for i in flips + [y * 8 + x]:
+            cells[i] = me
+        side = opp
+    return "".join(cells) + " " + side
+
+class Openings:
+    """Start positions that games are drawn from, by index.
+
+    Built from the XOT text file, or from a build_xot_index.py index, which already holds
+    validated, deduplicated positions as bitboards so nothing is replayed or parsed per
+    game. `board(i)` is the `setboard` argument; `moves(i)` the line for engines without it.
+    """
+    def __init__(self, lines, boards=None):
+        self.lines = lines
+        self.boards = boards
+
+    def __len__(self):
+        return len(self.lines)
+
+    def moves(self, i: int):
+        return xot_to_opening_line(self.lines[i])
+
+    def board(self, i: int) -> str:
+        if self.boards is not None:
+            return self.boards[i]
+        return opening_board(self.lines[i])
+
+    @classmethod
+    def from_xot_file(cls, path: str):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return cls([ln.strip() for ln in f if ln.strip()])
+
+    @classmethod
+    def from_index(cls, path: str):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, n_moves, count = build_xot_index.HEADER.unpack_from(data)
+        if magic != build_xot_index.MAGIC or version != build_xot_index.VERSION:
+            raise RuntimeError(f"{path} is not a version {build_xot_index.VERSION} XOT index")
+        record = struct.Struct(build_xot_index.BOARDS.format + f"{n_moves}s")
+        lines = []
+        boards = []
+        for player, opponent, moves in record.iter_unpack(data[build_xot_index.HEADER.size:]):
+            squares = [sq for sq in moves if sq != build_xot_index.NO_MOVE]
+            lines.append("".join(build_xot_index.square_to_coord(sq) for sq in squares))
+            boards.append(bitboards_to_board(player, opponent, len(squares) % 2 == 0))
+        assert len(lines) == count
+        return cls(lines, boards)
+
+def bitboards_to_board(player: int, opponent: int, black_to_move: bool) -> str:
+    """`setboard` argument for bitboards in Egaroucid's numbering (a1 = bit 63)."""
+    black, white = (player, opponent) if black_to_move else (opponent, player)
+    cells = []
+    for i in range(64):
+        bit = 1 << (63 - i)
+        cells.append("B" if black & bit else "W" if white & bit else "-")
+    return "".join(cells) + (" B" if black_to_move else " W")
+
+async def apply_opening(engine: GtpProc, opening_moves, board=None):
+    # One `setboard` round trip when the engine supports it; otherwise the opening is
+    # replayed move by move, pipelined: every `play` is on the wire before the first
+    # answer comes back.
+    if board is not None and engine.has_setboard:
+        resp = await engine.send(f"setboard {board}")
+        if resp.startswith("?"):
+            raise RuntimeError(f"setboard rejected {board}: {resp}")
+        return
+    resps = await asyncio.gather(
+        engine.send("clear_board"),
+        *(engine.send(f"play {color} {coord}") for color, coord in opening_moves),
+    )
+    for (color, coord), resp in zip(opening_moves, resps[1:]):
         if resp.startswith("?"):
             raise RuntimeError(f"illegal opening move {color} {coord}: {resp}")
 
-def genmove(engine: GtpProc, color: str) -> str:
-    resp = engine.send(f"genmove {color}")
+NODES_RE = re.compile(r"(?i)\bnodes?\b\s*[:=]?\s*(\d+)|(\d+)\s*nodes?\b")
+
+def parse_nodes(lines):
+    for line in lines:
+        m = NODES_RE.search(line)
+        if m:
+            return int(m.group(1) or m.group(2))
+    return None
+
+async def genmove(engine: GtpProc, color: str):
+    """Returns the move and, if the engine printed one, the number of nodes searched."""
+    resp = await engine.send(f"genmove {color}")
     if resp.startswith("?"):
         raise RuntimeError(f"genmove error: {resp}")
     parts = resp.split()
-    return parts[-1] if parts else "PASS"
+    nodes = parse_nodes(engine.last_diagnostics + [resp])
+    return (parts[-1] if parts else "PASS"), nodes
 
-def final_result_egar(egar: GtpProc) -> str:
-    resp = egar.send("gogui-rules_final_result")
+async def final_result_egar(egar: GtpProc) -> str:
+    resp = await egar.send("gogui-rules_final_result")
     if resp.startswith("?"):
         return ""
     return resp
 
-def play_one_game(egar: GtpProc, sensei: GtpProc, opening_moves, egar_is_black: bool):
-    apply_opening(egar, opening_moves)
-    apply_opening(sensei, opening_moves)
+async def play_one_game(egar: GtpProc, sensei: GtpProc, opening_moves, egar_is_black: bool, board=None):
+    await asyncio.gather(
+        apply_opening(egar, opening_moves, board),
+        apply_opening(sensei, opening_moves, board),
+    )
 
     stm_black = (len(opening_moves) % 2 == 0)
     pass_count = 0
 
+    moves = []
+    latency_ms = []
+    nodes = []
+
     for _ply in range(120):
         if pass_count >= 2:
             break
 
         color = "b" if stm_black else "w"
 
+        t0 = time.perf_counter()
         if (color == "b" and egar_is_black) or (color == "w" and not egar_is_black):
-            move = genmove(egar, color)
+            move, n = await genmove(egar, color)
+            latency_ms.append(round((time.perf_counter() - t0) * 1000.0, 3))
             if move.upper() == "PASS":
                 # Egaroucid doesn't update internal board on PASS in genmove
-                resp0 = egar.send(f"play {color} PASS")
+                resp0 = await egar.send(f"play {color} PASS")
                 if resp0.startswith("?"):
                     raise RuntimeError(f"egaroucid rejected PASS {color}: {resp0}")
-            resp2 = sensei.send(f"play {color} {move}")
+            resp2 = await sensei.send(f"play {color} {move}")
             if resp2.startswith("?"):
                 raise RuntimeError(f"sensei rejected move {color} {move}: {resp2}")
         else:
-            move = genmove(sensei, color)
-            resp2 = egar.send(f"play {color} {move}")
+            move, n = await genmove(sensei, color)
+            latency_ms.append(round((time.perf_counter() - t0) * 1000.0, 3))
+            resp2 = await egar.send(f"play {color} {move}")
             if resp2.startswith("?"):
                 raise RuntimeError(f"egaroucid rejected move {color} {move}: {resp2}")
 
+        moves.append(move.lower())
+        nodes.append(n)
         pass_count = (pass_count + 1) if move.upper() == "PASS" else 0
         stm_black = not stm_black
     else:
         raise RuntimeError("ply limit exceeded (possible desync); check play errors above")
 
-    fr = final_result_egar(egar)
+    fr = await final_result_egar(egar)
     diff_bw = parse_final_score(fr)
     eg_diff = diff_bw if egar_is_black else -diff_bw
 
@@ -175,76 +507,266 @@ def play_one_game(egar: GtpProc, sensei: GtpProc, opening_moves, egar_is_black:
         outcome = "L"
     else:
         outcome = "D"
-    return outcome, eg_diff
+    return outcome, eg_diff, moves, latency_ms, nodes
+
+def format_sprt(st: Stats, sprt) -> str:
+    elo0, elo1, alpha, beta = sprt
+    lower, upper = sprt_bounds(alpha, beta)
+    llr = sprt_llr(st.pairs, elo0, elo1)
+    penta = " ".join(str(c) for c in st.pairs)
+    return (
+        f"SPRT elo0={elo0:g} elo1={elo1:g}: LLR={llr:.3f} [{lower:.3f}, {upper:.3f}]\n"
+        f"Pairs (LL LD DD/WL WD WW): {penta}\n"
+    )
+
+PLY_RANGES = ((0, 20), (20, 40), (40, 60), (60, None))  # [lo, hi)
+
+def format_latency(st: Stats) -> str:
+    lines = ["Latency ms p50/p95/p99 (moves/s):\n"]
+    for engine in ("Egaroucid", "Sensei"):
+        for colour in ("black", "white"):
+            h = st.latency_by(lambda e, c, p: e == engine and c == colour)
+            if h.n == 0:
+                continue
+            rate = h.n / (h.total_ms / 1000.0) if h.total_ms else 0.0
+            lines.append(
+                f"  {engine:<9} as {colour.capitalize()}: "
+                f"{h.percentile(0.50):.3f}/{h.percentile(0.95):.3f}/{h.percentile(0.99):.3f} ({rate:.0f}/s)\n"
+            )
+        by_ply = []
+        for lo, hi in PLY_RANGES:
+            h = st.latency_by(lambda e, c, p: e == engine and lo <= p and (hi is None or p < hi))
+            if h.n:
+                label = f"{lo}+" if hi is None else f"{lo}-{hi - 1}"
+                by_ply.append(f"{label} {h.percentile(0.50):.3f}")
+        if by_ply:
+            lines.append(f"  {engine:<9} p50 by ply: " + "  ".join(by_ply) + "\n")
+        h = st.latency_by(lambda e, c, p: e == engine)
+        if h.nodes_ms:
+            lines.append(f"  {engine:<9} nodes/s: {h.nodes / (h.nodes_ms / 1000.0):.0f}\n")
+    return "".join(lines)
+
+def format_report(st: Stats, paired=False, sprt=None) -> str:
+    wr = winrate(st.eg_w, st.d, st.games) * 100.0
+    avgdiff = st.eg_disc_diff_sum / st.games if st.games else 0.0
+    elo, elo_err = elo_estimate(st, paired)
+    draw_ratio = st.d / st.games * 100.0 if st.games else 0.0
+    return (
+        f"Games: {st.games}\n"
+        f"Egaroucid: {st.eg_w}W {st.eg_l}L {st.d}D  (WinRate={wr:.2f}%)\n"
+        f"Sensei   : {st.eg_l}W {st.eg_w}L {st.d}D\n"
+        f"Elo diff (Egaroucid - Sensei): {elo:+.1f} +/- {elo_err:.1f} (95%)  DrawRatio={draw_ratio:.2f}%\n"
+        f"Avg disc diff (Egaroucid - Sensei): {avgdiff:.3f}\n"
+        f"As Black: {st.eg_as_black_w}W {st.eg_as_black_l}L {st.eg_as_black_d}D\n"
+        f"As White: {st.eg_as_white_w}W {st.eg_as_white_l}L {st.eg_as_white_d}D\n"
+        + (format_latency(st) if st.latency else "")
+        + (format_sprt(st, sprt) if sprt else "")
+        + f"---\n"
+    )
+
+async def start_engines(args):
+    # Depth-1 search never uses Egaroucid's thread pool; one thread per engine keeps
+    # N worker pairs from oversubscribing the machine.
+    egar, sensei = await asyncio.gather(
+        GtpProc([args.egar, "-gtp", "-q", "-t", "1"]).start(),
+        GtpProc([args.sensei, "--eval", args.sensei_eval]).start(),
+    )
+    return egar, sensei
+
+class GamePool:
+    """Play a game schedule on `n_workers` engine pairs from one event loop.
+
+    Workers pull (first game index, opening index, colours) jobs from one shared queue and
+    play the opening once per entry in `colours`, back to back. GameRecords are handed to
+    `on_result` strictly in game-index order, so the merged Stats and every intermediate
+    report are identical to a serial run with the same seed. Once `on_result` returns
+    True the pool stops: games still in flight are finished but not reported.
+    """
+    def __init__(self, args, openings: Openings, schedule, on_result):
+        self.args = args
+        self.openings = openings
+        self.schedule = schedule
+        self.on_result = on_result
+        self.jobs = asyncio.Queue()
+        self.pending = {}
+        self.next_g = schedule[0][0] if schedule else 0
+        self.stopped = False
+
+    def _deliver(self, rec: GameRecord):
+        self.pending[rec.game] = rec
+        while not self.stopped and self.next_g in self.pending:
+            if self.on_result(self.pending.pop(self.next_g)):
+                self.stopped = True
+            self.next_g += 1
+
+    async def _worker(self):
+        egar = sensei = None
+        try:
+            egar, sensei = await start_engines(self.args)
+            while not self.stopped and not self.jobs.empty():
+                g, idx, colours = self.jobs.get_nowait()
+                opening = self.openings.moves(idx)
+                board = self.openings.board(idx)
+                for i, egar_is_black in enumerate(colours):
+                    if self.stopped:
+                        break
+                    result = await play_one_game(egar, sensei, opening, egar_is_black, board)
+                    self._deliver(GameRecord(g + i, idx, egar_is_black, *result))
+        finally:
+            for engine in (egar, sensei):
+                if engine is not None:
+                    await engine.quit()
+
+    async def run(self):
+        for job in self.schedule:
+            self.jobs.put_nowait(job)
+        n_workers = max(1, min(self.args.workers, len(self.schedule)))
+        workers = [asyncio.create_task(self._worker()) for _ in range(n_workers)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+def load_records(path: str):
+    """Read the finished games of an interrupted run from a --record file.
+
+    A torn last line (the run died while writing it) is cut off so new records can be
+    appended cleanly.
+    """
+    records = []
+    good_size = 0
+    if not os.path.exists(path):
+        return records
+    with open(path, "rb") as f:
+        for raw in f:
+            try:
+                records.append(GameRecord(**json.loads(raw)))
+            except (ValueError, TypeError):
+                break
+            good_size += len(raw)
+    with open(path, "r+b") as f:
+        f.truncate(good_size)
+    return records
+
+def remaining_schedule(schedule, n_done: int):
+    """Drop the first `n_done` games from `schedule`, splitting a half-played pair."""
+    remaining = []
+    for g, idx, colours in schedule:
+        skip = max(0, n_done - g)
+        if skip < len(colours):
+            remaining.append((g + skip, idx, colours[skip:]))
+    return remaining
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--games", type=int, default=1000)
     ap.add_argument("--report_every", type=int, default=10)
     ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--workers", type=int, default=1, help="number of engine pairs driven in parallel")
+    ap.add_argument("--paired", action="store_true",
+                    help="play each sampled opening twice with colours swapped, back to back on one worker")
+    ap.add_argument("--sprt", type=float, nargs=4, default=None, metavar=("ELO0", "ELO1", "ALPHA", "BETA"),
+                    help="stop early once SPRT accepts H0 (elo0) or H1 (elo1); implies --paired")
     ap.add_argument("--xot_file", type=str, default="XOT opening.txt")
+    ap.add_argument("--xot_index", type=str, default=None,
+                    help="index written by build_xot_index.py; used instead of --xot_file")
     ap.add_argument("--egar", type=str, default="./build/egaroucid/egaroucid_gtp")
     ap.add_argument("--sensei", type=str, default="./build/sensei/sensei_depth1_gtp")
+    ap.add_argument("--sensei_eval", type=str, default="sensei-engine/pattern_evaluator.dat")
     ap.add_argument("--log", type=str, default="benchmark_results.log")
+    ap.add_argument("--record", type=str, default="benchmark_games.jsonl", help="append-only per-game record file")
+    ap.add_argument("--resume", action="store_true",
+                    help="rebuild the stats from --record and continue the run (same options and --seed)")
     args = ap.parse_args()
+    if args.sprt:
+        args.paired = True
+    if args.paired and args.games % 2:
+        ap.error(f"--games must be even with --paired/--sprt (each opening is played twice), got {args.games}")
 
     rnd = random.Random(args.seed)
 
-    with open(args.xot_file, "r", encoding="utf-8", errors="ignore") as f:
-        xot_lines = [ln.strip() for ln in f if ln.strip()]
-    if not xot_lines:
+    if args.xot_index:
+        openings = Openings.from_index(args.xot_index)
+    else:
+        openings = Openings.from_xot_file(args.xot_file)
+    if not len(openings):
         print("XOT opening file empty", file=sys.stderr)
         sys.exit(2)
 
-    egar = GtpProc([args.egar, "-gtp", "-q"])
-    sensei = GtpProc([args.sensei, "--eval", "sensei-engine/pattern_evaluator.dat"])
+    # The whole schedule is drawn up front from a single RNG stream, so the games played
+    # do not depend on how many workers there are or in which order they finish.
+    # Paired runs draw each opening once and play it twice with colours swapped
+    # (Egaroucid black first), which cancels most of the opening's bias per pair.
+    # SPRT needs the pentanomial pair statistics; there --games is only a cap.
+    if args.paired:
+        schedule = [(2 * p, rnd.randrange(len(openings)), (True, False)) for p in range(args.games // 2)]
+    else:
+        schedule = [(g, rnd.randrange(len(openings)), (g % 2 == 0,)) for g in range(args.games)]
+
+    done = load_records(args.record) if args.resume else []
+    expected = [(g + i, idx, b) for g, idx, colours in schedule for i, b in enumerate(colours)]
+    if [(r.game, r.opening, r.egar_black) for r in done] != expected[:len(done)]:
+        print(f"{args.record} does not match this run's schedule (check --seed/--games/--paired/--xot_file/--xot_index)",
+              file=sys.stderr)
+        sys.exit(2)
 
     st = Stats()
+    first_of_pair = {}
+
+    mode = "a" if args.resume else "w"
+    with open(args.log, mode, encoding="utf-8") as out, open(args.record, mode, encoding="utf-8") as rec_out:
+        replaying = False
+
+        def log(msg):
+            if replaying:
+                return
+            print(msg, end="")
+            out.write(msg)
+            out.flush()
+
+        def on_result(rec: GameRecord):
+            if not replaying:
+                rec_out.write(json.dumps(asdict(rec), separators=(",", ":")) + "\n")
+                rec_out.flush()
+            g, outcome = rec.game, rec.outcome
+            st.record(outcome, rec.disc_diff, rec.egar_black)
+            st.record_latency(rec, len(openings.moves(rec.opening)))
+            verdict = None
+            if args.paired and g % 2 == 0:
+                first_of_pair[g + 1] = outcome
+            elif args.paired:
+                st.record_pair(first_of_pair.pop(g), outcome)
+                if args.sprt:
+                    elo0, elo1, alpha, beta = args.sprt
+                    lower, upper = sprt_bounds(alpha, beta)
+                    llr = sprt_llr(st.pairs, elo0, elo1)
+                    if llr >= upper:
+                        verdict = f"SPRT: H1 accepted (elo1={elo1:g}) after {st.games} games, LLR={llr:.3f}\n"
+                    elif llr <= lower:
+                        verdict = f"SPRT: H0 accepted (elo0={elo0:g}) after {st.games} games, LLR={llr:.3f}\n"
+            if st.games % args.report_every == 0 or verdict:
+                log(format_report(st, args.paired, args.sprt))
+            if verdict:
+                log(verdict)
+                return True
+            return False
+
+        replaying = True
+        for rec in done:
+            if on_result(rec):
+                replaying = False
+                log(f"Resumed {args.record}: run already finished after {st.games} games\n")
+                log(format_report(st, args.paired, args.sprt))
+                return
+        replaying = False
+        if done:
+            log(f"Resumed {args.record} at game {st.games}\n")
 
-    with open(args.log, "w", encoding="utf-8") as out:
-        for g in range(args.games):
-            opening = xot_to_opening_line(rnd.choice(xot_lines))
-            egar_is_black = (g % 2 == 0)
-
-            outcome, eg_diff = play_one_game(egar, sensei, opening, egar_is_black)
-
-            st.games += 1
-            st.eg_disc_diff_sum += eg_diff
-
-            if egar_is_black:
-                if outcome == "W": st.eg_as_black_w += 1
-                elif outcome == "L": st.eg_as_black_l += 1
-                else: st.eg_as_black_d += 1
-            else:
-                if outcome == "W": st.eg_as_white_w += 1
-                elif outcome == "L": st.eg_as_white_l += 1
-                else: st.eg_as_white_d += 1
-
-            if outcome == "W":
-                st.eg_w += 1
-            elif outcome == "L":
-                st.eg_l += 1
-            else:
-                st.d += 1
-
-            if st.games % args.report_every == 0:
-                wr = winrate(st.eg_w, st.d, st.games) * 100.0
-                avgdiff = st.eg_disc_diff_sum / st.games
-                msg = (
-                    f"Games: {st.games}\n"
-                    f"Egaroucid: {st.eg_w}W {st.eg_l}L {st.d}D  (WinRate={wr:.2f}%)\n"
-                    f"Sensei   : {st.eg_l}W {st.eg_w}L {st.d}D\n"
-                    f"Avg disc diff (Egaroucid - Sensei): {avgdiff:.3f}\n"
-                    f"As Black: {st.eg_as_black_w}W {st.eg_as_black_l}L {st.eg_as_black_d}D\n"
-                    f"As White: {st.eg_as_white_w}W {st.eg_as_white_l}L {st.eg_as_white_d}D\n"
-                    f"---\n"
-                )
-                print(msg, end="")
-                out.write(msg)
-                out.flush()
-
-    egar.quit()
-    sensei.quit()
+        todo = remaining_schedule(schedule, len(done))
+        if todo:
+            asyncio.run(GamePool(args, openings, todo, on_result).run())
 
 if __name__ == "__main__":
     main()
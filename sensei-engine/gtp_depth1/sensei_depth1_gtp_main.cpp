@@ -61,6 +61,38 @@ struct GameState {
   bool stm_is_black = true;
 };
 
+static const char* const kKnownCommands[] = {
+  "quit", "clear_board", "play", "genmove", "final_score", "setboard", "known_command",
+};
+
+static inline bool IsBlackChar(char c) {
+  return c=='B' || c=='b' || c=='X' || c=='x' || c=='*' || c=='0';
+}
+static inline bool IsWhiteChar(char c) {
+  return c=='W' || c=='w' || c=='O' || c=='o' || c=='1';
+}
+
+// Same format as Egaroucid's setboard: 64 squares a1,b1,...,h8 then the side to move,
+// whitespace ignored. Squares use this wrapper's a1=0 numbering (see ParseCoord).
+static inline bool ParseBoard(const string& s, GameState* st) {
+  string t; t.reserve(s.size());
+  for (char c : s) if (!isspace((unsigned char)c)) t.push_back(c);
+  if (t.size()!=65) return false;
+  BitPattern black = 0ULL, white = 0ULL;
+  for (int i=0;i<64;i++) {
+    if (IsBlackChar(t[i])) black |= 1ULL << i;
+    else if (IsWhiteChar(t[i])) white |= 1ULL << i;
+    else if (t[i]!='-' && t[i]!='.') return false;
+  }
+  bool is_black;
+  if (IsBlackChar(t[64])) is_black = true;
+  else if (IsWhiteChar(t[64])) is_black = false;
+  else return false;
+  st->board = is_black ? Board(black, white) : Board(white, black);
+  st->stm_is_black = is_black;
+  return true;
+}
+
 static inline void Reset(GameState& st) {
   st.board = Board();
   st.stm_is_black = true;
@@ -150,6 +182,19 @@ int main(int argc, char** argv) {
       cout << Ok(id) << flush;
       continue;
     }
+    if (cmd=="known_command") {
+      string name; iss >> name;
+      bool known = any_of(begin(kKnownCommands), end(kKnownCommands),
+                          [&](const char* c){ return name==c; });
+      cout << Ok(id, known ? "true" : "false") << flush;
+      continue;
+    }
+    if (cmd=="setboard") {
+      string rest; getline(iss, rest);
+      if (!ParseBoard(rest, &st)) { cout << Err(id,"illegal board") << flush; continue; }
+      cout << Ok(id) << flush;
+      continue;
+    }
     if (cmd=="play") {
       string color_s, coord_s;
       iss >> color_s >> coord_s;